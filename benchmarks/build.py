@@ -0,0 +1,202 @@
+"""
+Measure the build of a generated documentation project, of a configurable size.
+
+The project has pages of field-description, code-description and workedexample directives, pages of
+field-description-table and codelist-table directives, a page of workedexamplelist directives, and a page of
+extensionlist directives, which read a generated extension lockfile instead of the extension registry.
+
+For each number of processes, this measures the time of a full build and of an incremental build (after changing some
+pages), the peak memory of the build, and the size of the environment pickle.
+
+Usage: python benchmarks/build.py [--pages N] [--jobs N] [--save | --compare] [--baseline FILE]
+"""
+
+import argparse
+import csv
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+# Run Sphinx in a child process, and print its peak memory, including its parallel processes.
+RUNNER = """
+import json, resource, sys
+from sphinx.cmd.build import main
+status = main(sys.argv[1:])
+peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"status": status, "peak_kib": peak}))
+"""
+
+EXTENSIONS = ("bids", "enquiries", "location", "lots", "milestone_documents", "participation_fee", "process_title")
+
+
+def generate(directory, pages, fields, objects, codes, examples):
+    """Write a Sphinx project to the directory."""
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # A schema with an object of 20 fields per definition, like the OCDS release schema.
+    schema = {"properties": {}, "definitions": {}}
+    for i in range(objects):
+        schema["properties"][f"object{i}"] = {"$ref": f"#/definitions/Object{i}", "description": f"Object {i}."}
+        schema["definitions"][f"Object{i}"] = {
+            "type": "object",
+            "description": f"An **object** {i}.",
+            "properties": {
+                f"field{j}": {"type": "string", "description": f"The *field* {j} of object {i}. See [a link](#{j})."}
+                for j in range(20)
+            },
+        }
+    (directory / "schema.json").write_text(json.dumps(schema, indent=2))
+
+    with (directory / "codelist.csv").open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Code", "Title", "Description"])
+        for i in range(codes):
+            writer.writerow([f"code{i}", f"Code {i}", f"The **code** {i}, which is described in some detail."])
+
+    extension_versions = dict.fromkeys(EXTENSIONS, "v1.1.5")
+    lockfile = {
+        "extension_versions": extension_versions,
+        "categories": ["bids", "tender"],
+        "extensions": {
+            identifier: {
+                "version": version,
+                "category": "tender",
+                "name": {"en": identifier.title()},
+                "description": {"en": f"The {identifier} extension."},
+                "explorer_name": {"en": identifier.title()},
+                "explorer_url": {
+                    "en": f"https://extensions.open-contracting.org/en/extensions/{identifier}/{version}/"
+                },
+            }
+            for identifier, version in extension_versions.items()
+        },
+    }
+    (directory / "extensions.lock.json").write_text(json.dumps(lockfile, indent=2))
+
+    (directory / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\n'
+        'exclude_patterns = ["_build"]\n'
+        f"extension_versions = {extension_versions!r}\n"
+        'opencontracting_extension_lockfile = "extensions.lock.json"\n'
+    )
+
+    names = [f"page{i}" for i in range(pages)]
+    for i, name in enumerate(names):
+        lines = [f"Page {i}", "=" * len(f"Page {i}"), ""]
+        for j in range(fields):
+            pointer = f"/definitions/Object{(i * fields + j) // 20 % objects}/properties/field{j % 20}"
+            lines += [f".. field-description:: schema.json {pointer}", ""]
+            lines += [f".. code-description:: codelist.csv code{(i * fields + j) % codes}", ""]
+        for j in range(examples):
+            lines += [f".. workedexample:: Example {i}.{j}", f"   :tags: tag{j % 10},page{i % 10}", ""]
+        (directory / f"{name}.rst").write_text("\n".join(lines))
+
+    (directory / "tables.rst").write_text(
+        "Tables\n======\n\n"
+        + "".join(
+            f".. field-description-table:: schema.json /definitions/Object{i}/properties\n\n" for i in range(objects)
+        )
+        + ".. codelist-table:: codelist.csv\n"
+    )
+    (directory / "examples.rst").write_text(
+        "Examples\n========\n\n"
+        + "".join(f".. workedexamplelist:: Tag {j}\n   :tag: tag{j}\n\n" for j in range(min(examples, 10)))
+    )
+    (directory / "extensions.rst").write_text(
+        "Extensions\n==========\n\n.. extensionlist:: Extensions\n\n.. extensionexplorerlinklist::\n"
+    )
+
+    toctree = "\n".join(f"   {name}" for name in [*names, "tables", "examples", "extensions"])
+    (directory / "index.rst").write_text(f"Index\n=====\n\n.. toctree::\n\n{toctree}\n")
+
+    return names
+
+
+def build(srcdir, builddir, jobs):
+    args = [sys.executable, "-c", RUNNER, "-b", "html", "-q", str(srcdir), str(builddir / "html")]
+    args += ["-d", str(builddir / "doctrees")]
+    if jobs > 1:
+        args += ["-j", str(jobs)]
+
+    start = time.perf_counter()
+    process = subprocess.run(args, capture_output=True, text=True, check=True)  # noqa: S603
+    seconds = time.perf_counter() - start
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    if result["status"]:
+        sys.exit(process.stderr)
+    return seconds, result["peak_kib"]
+
+
+def measure(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        srcdir = Path(directory) / "src"
+        names = generate(srcdir, args.pages, args.fields, args.objects, args.codes, args.examples)
+
+        for jobs in sorted({1, args.jobs}):
+            builddir = Path(directory) / f"build-{jobs}"
+
+            full, peak = build(srcdir, builddir, jobs)
+
+            # Change a tenth of the pages.
+            for name in names[:: max(len(names) // 10, 1)]:
+                path = srcdir / f"{name}.rst"
+                path.write_text(path.read_text() + "\nChanged.\n")
+            incremental, _ = build(srcdir, builddir, jobs)
+
+            results[f"-j {jobs}"] = {
+                "full_seconds": round(full, 3),
+                "incremental_seconds": round(incremental, 3),
+                "peak_mib": round(peak / 1024, 1),
+                "environment_kib": round((builddir / "doctrees" / "environment.pickle").stat().st_size / 1024, 1),
+            }
+
+    parameters = {key: getattr(args, key) for key in ("pages", "fields", "objects", "codes", "examples", "jobs")}
+    return {"parameters": parameters, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--pages", type=int, default=50, help="the number of pages")
+    parser.add_argument("--fields", type=int, default=40, help="the number of fields and codes on each page")
+    parser.add_argument("--objects", type=int, default=100, help="the number of objects of 20 fields in the schema")
+    parser.add_argument("--codes", type=int, default=5000, help="the number of codes in the codelist")
+    parser.add_argument("--examples", type=int, default=10, help="the number of worked examples on each page")
+    parser.add_argument("--jobs", type=int, default=4, help="the number of processes of the parallel build")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--save", action="store_true", help="store the results as the baseline")
+    group.add_argument("--compare", action="store_true", help="compare the results to the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="the baseline file")
+    args = parser.parse_args()
+
+    data = measure(args)
+
+    if args.compare:
+        with args.baseline.open() as f:
+            baseline = json.load(f)
+        if baseline["parameters"] != data["parameters"]:
+            print(f"The baseline's parameters differ: {baseline['parameters']}")
+
+    for mode, result in data["results"].items():
+        print(mode)
+        for key, value in result.items():
+            line = f"  {key:>20}: {value:10}"
+            if args.compare and mode in baseline["results"]:
+                previous = baseline["results"][mode][key]
+                line += f" (baseline {previous}, {(value - previous) / previous:+.0%})"
+            print(line)
+
+    if args.save:
+        with args.baseline.open("w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measure the time to import the extension, and to import the dependencies that it imports on first use.
+
+Each import is measured with ``python -X importtime`` in a new process, after importing Sphinx, like in a build.
+
+Usage: python benchmarks/imports.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = ("sphinxcontrib.opencontracting", "myst_parser.parsers.mdit", "ocdsextensionregistry", "requests")
+
+
+def measure(module):
+    """Return the cumulative time in milliseconds to import the module, after importing Sphinx."""
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import sphinx.application; import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in process.stderr.splitlines():
+        _, _, cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        if name == module:
+            return int(cumulative) / 1000
+    # The module was imported by Sphinx.
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=5, help="the number of measurements of each import")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        milliseconds = statistics.median(measure(module) for _ in range(args.runs))
+        print(f"{module:>30}: {milliseconds:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure the peak and retained memory and the time of loading a generated JSON Schema file, with and without pruning.
+
+The schema has definitions of objects of 20 fields, like the OCDS release schema, with the types, enums, codelists,
+examples and other properties of a profile schema that merges many extensions.
+
+Usage: python benchmarks/schema_memory.py [--objects N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Load the schema in a child process, and print the time, and the peak and retained memory allocated while loading.
+# The time is measured without tracemalloc, which slows allocations.
+RUNNER = """
+import json, sys, time, tracemalloc
+from sphinxcontrib.opencontracting import SchemaCache
+start = time.perf_counter()
+schema = SchemaCache(prune_size=int(sys.argv[2])).get(sys.argv[1])
+seconds = time.perf_counter() - start
+tracemalloc.start()
+schema = SchemaCache(prune_size=int(sys.argv[2])).get(sys.argv[1])
+retained, peak = tracemalloc.get_traced_memory()
+result = {"seconds": seconds, "peak_kib": peak / 1024, "retained_kib": retained / 1024}
+print(json.dumps(result | {"descriptions": len(schema.descriptions)}))
+"""
+
+
+def generate(path, objects):
+    """Write a JSON Schema file."""
+    schema = {"$schema": "http://json-schema.org/draft-04/schema#", "properties": {}, "definitions": {}}
+    for i in range(objects):
+        schema["properties"][f"object{i}"] = {
+            "title": f"Object {i}",
+            "description": f"Object {i}.",
+            "type": "array",
+            "items": {"$ref": f"#/definitions/Object{i}"},
+            "uniqueItems": True,
+        }
+        schema["definitions"][f"Object{i}"] = {
+            "title": f"Object {i}",
+            "description": f"An **object** {i}.",
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                f"field{j}": {
+                    "title": f"Field {j}",
+                    "description": f"The *field* {j} of object {i}. See [a link](#{j}).",
+                    "type": ["string", "null"],
+                    "codelist": f"codelist{j}.csv",
+                    "openCodelist": False,
+                    "enum": [f"code{k}" for k in range(10)],
+                    "examples": [f"An example value of field {j}"],
+                    "minLength": 1,
+                    "wholeListMerge": True,
+                    "deprecated": None,
+                }
+                for j in range(20)
+            },
+            "patternProperties": {"^(field0_(((([A-Za-z]{2,3}(-([A-Za-z]{3}(-[A-Za-z]{3}){0,2}))?)))))$": {}},
+        }
+    path.write_text(json.dumps(schema, indent=2))
+
+
+def measure(path, prune_size):
+    args = [sys.executable, "-c", RUNNER, str(path), str(prune_size)]
+    process = subprocess.run(args, capture_output=True, text=True, check=True)  # noqa: S603
+    return json.loads(process.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--objects", type=int, default=500, help="the number of objects of 20 fields in the schema")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "schema.json"
+        generate(path, args.objects)
+        print(f"{path.stat().st_size / 1024 / 1024:.1f} MiB")
+
+        full = measure(path, path.stat().st_size + 1)
+        pruned = measure(path, 0)
+
+    assert full["descriptions"] == pruned["descriptions"]  # noqa: S101
+
+    for mode, result in (("full", full), ("pruned", pruned)):
+        peak = result["peak_kib"] / 1024
+        retained = result["retained_kib"] / 1024
+        print(f"{mode:>8}: {peak:8.1f} MiB peak {retained:8.1f} MiB retained {result['seconds']:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare the size and load time of the environment's worked examples, stored as records or as docutils nodes.
+
+Usage: python benchmarks/worked_examples.py [NUMBER]
+"""
+
+import pickle
+import sys
+import timeit
+
+from docutils import nodes
+
+from sphinxcontrib.opencontracting import WorkedExampleRecord, WorkedExamples
+
+
+def records(number):
+    worked_examples = WorkedExamples()
+    for i in range(number):
+        worked_examples.add(
+            WorkedExampleRecord(
+                f"guidance/page{i // 10}", i % 10 * 20, f"worked-example-{i % 10}", f"Title {i}", ("a", "b")
+            )
+        )
+    return worked_examples
+
+
+def targets(number):
+    # The format before WorkedExampleRecord.
+    worked_examples = []
+    for i in range(number):
+        target = nodes.target("", "", refid=f"worked-example-{i % 10}")
+        worked_examples.append(
+            {
+                "docname": f"guidance/page{i // 10}",
+                "lineno": i % 10 * 20,
+                "target": target,
+                "title": f"Title {i}",
+                "tags": "a,b",
+            }
+        )
+    return worked_examples
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    print(f"{number} worked examples")
+    for name, factory in (("records", records), ("targets", targets)):
+        data = pickle.dumps(factory(number), pickle.HIGHEST_PROTOCOL)
+        seconds = min(timeit.repeat(lambda data=data: pickle.loads(data), number=10, repeat=5)) / 10
+        print(f"{name:>8}: {len(data) / 1024:8.1f} KiB, {seconds * 1000:6.2f} ms to load")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,1439 @@
+import argparse
+import copy
 import csv
+import email.utils
+import functools
+import hashlib
 import json
+import math
 import os
-from functools import lru_cache
+import pickle
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import cached_property, partial
 from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlsplit
 
+import docutils
 import jsonpointer
-import requests
 from docutils import nodes
 from docutils.parsers.rst import Directive, directives
-from myst_parser.config.main import MdParserConfig
-from myst_parser.mdit_to_docutils.base import DocutilsRenderer, make_document
-from myst_parser.parsers.mdit import create_md_parser
-from ocdsextensionregistry import ExtensionRegistry
+from docutils.utils import Reporter, new_document
+from sphinx.builders import Builder
 from sphinx.errors import SphinxError
+from sphinx.util import logging
 
 try:
     from docutils.parsers.rst.roles import normalize_options
 except ImportError:
     from docutils.parsers.rst.roles import set_classes as normalize_options
 
+# The directives whose data the prescan loads, in reStructuredText, or in MyST's backtick or colon fences.
+prescan_directives = (
+    "field-description-table|field-description|codelist-table|code-description|extension(?:explorerlink)?list"
+)
+prescan_pattern = re.compile(
+    rf"^[ \t]*(?:\.\.[ \t]+({prescan_directives})::|(?:`{{3,}}|:{{3,}})\{{({prescan_directives})\}})(.*)$",
+    re.MULTILINE,
+)
+
 live_branch = os.getenv("GITHUB_REF_NAME", "") in {"1.0", "1.1", "latest"}
 url_prefix = "https://raw.githubusercontent.com/open-contracting/extension_registry/main/"
 extensions_url = f"{url_prefix}extensions.csv"
 extension_versions_url = f"{url_prefix}extension_versions.csv"
 extension_explorer_template = "https://extensions.open-contracting.org/{}/extensions/{}/{}/"
+extension_explorer_extensions_url = "https://extensions.open-contracting.org/extensions.json"
 WORKEDEXAMPLE_ENV_ATTRIBUTE = "workedexample_all_worked_examples"
+DESCRIPTION_ENV_ATTRIBUTE = "opencontracting_description_digests"
+CONFIG_ENV_ATTRIBUTE = "opencontracting_config_digests"
+ERROR_ENV_ATTRIBUTE = "opencontracting_errors"
+PROFILE_ENV_ATTRIBUTE = "opencontracting_profile"
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """
+    Record the wall time of calls, by name, and the caches' counters.
+
+    Parallel processes drain their samples into their environments, which are merged into the main process's samples.
+    """
+
+    def __init__(self):
+        #: Whether to record samples.
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        #: The process that reports the samples.
+        self.pid = os.getpid()
+        #: The samples recorded since the last drain, by name.
+        self.pending = {}
+        #: The samples collected from this process and from parallel processes, by name.
+        self.collected = {}
+        #: The changes to the caches' counters in parallel processes.
+        self.counters = {}
+        self._baseline = {}
+
+    @contextmanager
+    def time(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                self.pending.setdefault(name, []).append(seconds)
+
+    def collect(self):
+        """Move this process's samples to the collected samples, and note the caches' counters, before forking."""
+        with self.lock:
+            _merge_samples(self.collected, self.pending)
+            self.pending = {}
+        self._baseline = get_cache_counters()
+
+    def drain(self):
+        """Return and clear the samples and the changes to the caches' counters, in a parallel process."""
+        with self.lock:
+            samples = self.pending
+            self.pending = {}
+
+        counters = get_cache_counters()
+        changes = {
+            name: {key: value - self._baseline.get(name, {}).get(key, 0) for key, value in values.items()}
+            for name, values in counters.items()
+        }
+        self._baseline = counters
+        return {"samples": samples, "counters": changes}
+
+    def merge(self, data):
+        """Add the samples and the changes to the caches' counters from a parallel process."""
+        with self.lock:
+            _merge_samples(self.collected, data["samples"])
+        for name, values in data["counters"].items():
+            for key, value in values.items():
+                self.counters.setdefault(name, {}).setdefault(key, 0)
+                self.counters[name][key] += value
+
+    def report(self):
+        """Return the count, total time and 95th percentile time of each name, and the caches' counters."""
+        samples = {}
+        with self.lock:
+            _merge_samples(samples, self.collected)
+            _merge_samples(samples, self.pending)
+
+        timers = {}
+        for name, values in sorted(samples.items()):
+            seconds = sorted(values)
+            timers[name] = {
+                "count": len(seconds),
+                "total": sum(seconds),
+                "p95": seconds[math.ceil(len(seconds) * 0.95) - 1],
+            }
+
+        caches = {}
+        for name, values in get_cache_counters().items():
+            caches[name] = {key: value + self.counters.get(name, {}).get(key, 0) for key, value in values.items()}
+            total = sum(caches[name].values())
+            caches[name]["hit_rate"] = caches[name]["hits"] / total if total else None
+
+        return {"timers": timers, "caches": caches}
+
+
+def _merge_samples(samples, other):
+    for name, seconds in other.items():
+        samples.setdefault(name, []).extend(seconds)
+
+
+profiler = Profiler()
+
+
+def profiled(function):
+    """Record the wall time of calls to the function or method, if the profiler is enabled."""
+    name = function.__qualname__.removesuffix(".run")
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with profiler.time(name):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+class MarkdownCache:
+    """
+    Cache the documents rendered from Markdown text, evicting the least recently used.
+
+    The Markdown parser and the document settings are created once and reused.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._parser = None
+        self._settings = None
+
+    def get(self, text):
+        """Return a deep copy of the document rendered from the Markdown text."""
+        return self.get_many([text])[0]
+
+    @profiled
+    def get_many(self, texts):
+        """Return deep copies of the documents rendered from the Markdown texts, rendering them in one batch."""
+        documents = []
+        with self.lock:
+            for text in texts:
+                document = self.entries.get(text)
+                if document is None:
+                    self.misses += 1
+                    document = self._render(text)
+                    self.entries[text] = document
+                else:
+                    self.hits += 1
+                    self.entries.move_to_end(text)
+                documents.append(document)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+        return [document.deepcopy() for document in documents]
+
+    def _render(self, text):
+        # Code is similar to myst_parser.parsers.docutils_.Parser.parse.
+        if self._parser is None:
+            # MyST is imported on first use, to not slow the import of this extension.
+            from docutils.parsers.rst.languages import get_language as get_language_rst
+            from myst_parser.config.main import MdParserConfig
+            from myst_parser.mdit_to_docutils.base import DocutilsRenderer, make_document
+            from myst_parser.parsers.mdit import create_md_parser
+
+            class Renderer(DocutilsRenderer):
+                def setup_render(self, options, env):
+                    # DocutilsRenderer.setup_render evaluates options.get("document", make_document()), which builds
+                    # the default docutils settings on each render, even if the document is set.
+                    # Code is similar to DocutilsRenderer.setup_render.
+                    self.md_env = env
+                    self.md_options = options
+                    self.md_config = options["myst_config"]
+                    self.document = options["document"]
+                    self.current_node = options.get("current_node", self.document)
+                    self.reporter = self.document.reporter
+                    self.language_module_rst = get_language_rst(self.document.settings.language_code)
+                    self._heading_offset = 0
+                    self._level_to_section = {0: self.document}
+                    self._heading_slugs = {}
+
+            self._parser = create_md_parser(MdParserConfig(), Renderer)
+            self._settings = make_document().settings
+        self._parser.options["document"] = new_document("notset", settings=self._settings)
+        return self._parser.render(text)
+
+    def resize(self, maxsize):
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+
+markdown_cache = MarkdownCache()
 
 
 # to_docutils was removed in myst-parser>=0.18.
+@profiled
 def to_docutils(text):
-    # Code is similar to myst_parser.parsers.docutils_.Parser.parse.
-    parser = create_md_parser(MdParserConfig(), DocutilsRenderer)
-    parser.options["document"] = make_document()
-    return parser.render(text)
+    return markdown_cache.get(text)
+
+
+class Transport:
+    """
+    Make HTTP requests with a keep-alive session, retrying with exponential backoff, and limiting concurrency.
+
+    Connection errors, timeouts, 429 and 5xx responses, and 403 responses for rate limits are retried. If a response
+    has a ``Retry-After`` header, its delay is used instead of the backoff.
+    """
+
+    #: The status codes of responses to retry.
+    retry_statuses = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, retries=3, backoff=0.5, max_connections=8):
+        self.lock = threading.Lock()
+        self._session = None
+        self._pid = None
+        self.configure(retries, backoff, max_connections)
+        self.reset()
+
+    def configure(self, retries, backoff, max_connections, max_delay=60):
+        #: The number of times to retry a request.
+        self.retries = retries
+        #: The number of seconds to wait before the first retry, doubled for each retry.
+        self.backoff = backoff
+        #: The maximum number of concurrent requests.
+        self.max_connections = max_connections
+        #: The maximum number of seconds to wait before a retry.
+        self.max_delay = max_delay
+        self.semaphore = threading.BoundedSemaphore(max_connections)
+        self.close()
+
+    @property
+    def session(self):
+        import requests
+
+        # Sessions aren't shared with forked processes.
+        with self.lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=self.max_connections, pool_maxsize=self.max_connections
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def get(self, url, headers=None):
+        """
+        Return the response. Responses with error status codes are returned once retries are exhausted.
+
+        :raises requests.RequestException: if the request fails after all retries
+        """
+        import requests
+
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            response = error = None
+            with self.semaphore, profiler.time(f"GET {host}"):
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(url, headers=headers, timeout=10)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                seconds = time.perf_counter() - start
+
+            retry = attempt < self.retries and (error is not None or self._is_retryable(response))
+            self._record(host, seconds, error=error is not None, retry=retry)
+            if not retry:
+                if error is not None:
+                    raise error
+                return response
+
+            time.sleep(min(self._get_delay(response, attempt), self.max_delay))
+            attempt += 1
+
+    def _is_retryable(self, response):
+        import requests
+
+        if response.status_code in self.retry_statuses:
+            return True
+        # GitHub responds with "403 rate limit exceeded".
+        return response.status_code == requests.codes.forbidden and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in response.reason.lower()
+        )
+
+    def _get_delay(self, response, attempt):
+        value = response.headers.get("Retry-After") if response is not None else None
+        if value is not None:
+            try:
+                return max(float(value), 0)
+            except ValueError:
+                with suppress(TypeError, ValueError):
+                    return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        return self.backoff * 2**attempt
+
+    def _record(self, host, seconds, *, error, retry):
+        with self.lock:
+            stats = self.hosts.setdefault(host, {"requests": 0, "retries": 0, "errors": 0, "seconds": 0})
+            stats["requests"] += 1
+            stats["retries"] += retry
+            stats["errors"] += error
+            stats["seconds"] += seconds
+
+    def close(self):
+        with self.lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+
+    def reset(self):
+        #: The number of requests, retries and errors, and the total seconds of requests, for each host.
+        self.hosts = {}
+
+
+transport = Transport()
+
+
+class HTTPCache:
+    """
+    Cache HTTP responses on disk, and revalidate them with conditional requests once they are older than the TTL.
+
+    If a request fails, a cached response is returned, even if stale.
+    """
+
+    def __init__(self, directory=None, ttl=3600):
+        self.configure(directory, ttl)
+        self.reset()
+
+    def configure(self, directory, ttl):
+        #: The directory in which to cache responses. If ``None``, responses are not cached.
+        self.directory = directory
+        #: The number of seconds after which to revalidate a cached response.
+        self.ttl = ttl
+
+    def get(self, url):
+        """
+        Return the body of the response.
+
+        :raises requests.RequestException: if the request fails and no response is cached
+        """
+        import requests
+
+        if self.directory is None:
+            self.misses += 1
+            response = self.fetch(url)
+            response.raise_for_status()
+            return response.content
+
+        path = self.directory / hashlib.sha256(url.encode()).hexdigest()
+        try:
+            header, body = path.read_bytes().split(b"\n", 1)
+            metadata = json.loads(header)
+        except (OSError, ValueError):
+            metadata = body = None
+
+        if metadata and time.time() - metadata["time"] < self.ttl:
+            self.hits += 1
+            return body
+
+        headers = {}
+        if metadata and metadata["etag"]:
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata and metadata["last_modified"]:
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+        try:
+            response = self.fetch(url, headers)
+            if response.status_code != requests.codes.not_modified:
+                response.raise_for_status()
+        except requests.RequestException as e:
+            if body is None:
+                raise
+            logger.info("Using cached response for %s: %s", url, e)
+            self.stale += 1
+            return body
+
+        if response.status_code == requests.codes.not_modified:
+            self.revalidated += 1
+        else:
+            self.misses += 1
+            body = response.content
+            metadata = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+        metadata["time"] = time.time()
+        _write(path, json.dumps(metadata).encode() + b"\n" + body)
+        return body
+
+    @profiled
+    def fetch(self, url, headers=None):
+        return transport.get(url, headers)
+
+    def reset(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.stale = 0
+        self.misses = 0
+
+
+http_cache = HTTPCache()
+
+
+def _write(path, content):
+    # Write atomically, in case of concurrent builds.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        f.write(content)
+    Path(f.name).replace(path)
+
+
+def get_extension_explorer_names(extension_versions, url=None):
+    """
+    Return the Extension Explorer's names of the extension versions, by identifier and version.
+
+    Only the names of the extension versions are kept, not the whole extensions.json file.
+
+    :param url: the URL of the Extension Explorer's extensions.json file, if not ``extension_explorer_extensions_url``
+    """
+    extensions = json.loads(http_cache.get(url or extension_explorer_extensions_url))
+
+    names = {}
+    for identifier, version in extension_versions.items():
+        with suppress(KeyError):
+            names[(identifier, version)] = extensions[identifier]["versions"][version]["metadata"]["name"]
+    return names
+
+
+def get_extension_metadata(extension):
+    """Return the parsed contents of the extension version's extension.json file, like ``extension.metadata``."""
+    metadata = json.loads(http_cache.get(extension.get_url("extension.json")))
+    # Code is similar to ocdsextensionregistry.ExtensionVersion.metadata.
+    for field in ("name", "description", "documentationUrl"):
+        metadata.setdefault(field, {})
+        if not isinstance(metadata[field], dict):
+            metadata[field] = {"en": metadata[field]}
+    if "compatibility" not in metadata or isinstance(metadata["compatibility"], str):
+        metadata["compatibility"] = ["1.1"]
+    return metadata
+
+
+def _resolve(path):
+    # Directives and get_outdated_descriptions look up the same few files many times, and resolving a path is slow.
+    return _realpath(Path(path).absolute())
+
+
+@functools.lru_cache(maxsize=1024)
+def _realpath(path):
+    return path.resolve()
+
+
+class FileCache:
+    """
+    Cache the result of loading a file, keyed on its resolved path and any additional key.
+
+    An entry is reloaded if the file's modification time or size changes.
+    """
+
+    def __init__(self, load):
+        self.load = load
+        self.entries = {}
+        # Files are loaded outside the lock, so that different files can be loaded concurrently.
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, *key):
+        """
+        Return the loaded contents of the file.
+
+        :raises OSError: if the file can't be read
+        """
+        path = _resolve(path)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get((path, *key))
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = self.load(path, *key)
+        with self.lock:
+            self.entries[(path, *key)] = (signature, value)
+        return value
+
+    def discard(self, paths):
+        """Remove the entries of the files at the paths."""
+        paths = {_resolve(path) for path in paths}
+        with self.lock:
+            for key in [key for key in self.entries if key[0] in paths]:
+                del self.entries[key]
+
+    def clear(self):
+        self.entries.clear()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+
+class Schema:
+    def __init__(self, data):
+        #: The parsed JSON Schema.
+        self.data = data
+        #: The description at each JSON Pointer.
+        self.descriptions = dict(_iter_descriptions(data))
+
+    @cached_property
+    def dereferenced_descriptions(self):
+        """
+        The description at each JSON Pointer, including pointers that go through local ``$ref`` properties.
+
+        Where a subschema has both a ``$ref`` property and a description, its own description is used.
+        """
+        descriptions = {}
+        for pointer, description in _iter_descriptions(self.data, root=self.data):
+            descriptions.setdefault(pointer, description)
+        return descriptions
+
+
+def _iter_descriptions(data, pointer="", root=None, refs=()):
+    # If root is set, follow local $ref properties, except those already followed to reach this subschema (cycles).
+    if isinstance(data, dict):
+        # A "description" member might be a property named "description", not a description.
+        if isinstance(data.get("description"), str):
+            yield pointer, data["description"]
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return
+
+    for key, value in items:
+        yield from _iter_descriptions(value, f"{pointer}/{jsonpointer.escape(str(key))}", root, refs)
+
+    if root is not None and isinstance(data, dict):
+        ref = data.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#") and ref not in refs:
+            try:
+                target = jsonpointer.resolve_pointer(root, ref[1:])
+            except jsonpointer.JsonPointerException:
+                return
+            yield from _iter_descriptions(target, pointer, root, (*refs, ref))
+
+
+def _prune(pairs):
+    # Keep only descriptions, $ref properties, and the objects and arrays that contain them.
+    return {
+        key: value
+        for key, value in pairs
+        if key in {"description", "$ref"} or (isinstance(value, (dict, list)) and _has_descriptions(value))
+    }
+
+
+def _has_descriptions(value):
+    if isinstance(value, dict):
+        # Objects are pruned as they are parsed, so a non-empty object has a description or $ref property.
+        return bool(value)
+    if isinstance(value, list):
+        return any(_has_descriptions(item) for item in value)
+    return False
+
+
+class SchemaCache(FileCache):
+    """
+    Cache JSON Schema files.
+
+    To reduce memory use, files of at least ``prune_size`` bytes are pruned while being parsed, keeping only
+    descriptions, ``$ref`` properties, and the objects and arrays that contain them. The full object tree is never
+    built.
+    """
+
+    def __init__(self, prune_size=1024 * 1024):
+        super().__init__(self._load)
+        #: The size in bytes from which to prune files while parsing them.
+        self.prune_size = prune_size
+
+    def _load(self, path):
+        with path.open(encoding="utf-8") as f:
+            if os.fstat(f.fileno()).st_size >= self.prune_size:
+                return Schema(json.load(f, object_pairs_hook=_prune))
+            return Schema(json.load(f))
+
+
+class Codelist:
+    def __init__(self, reader, column):
+        #: The names of the columns.
+        self.fieldnames = reader.fieldnames
+        #: The first row for each code.
+        self.rows = {}
+        #: The name of the code column, if it is missing and the codelist has rows.
+        self.missing_column = None
+
+        for row in reader:
+            try:
+                self.rows.setdefault(row[column], row)
+            except KeyError:
+                self.missing_column = column
+                break
+
+    def get(self, code):
+        """
+        Return the first row for the code, or ``None``.
+
+        :raises KeyError: if the code column is missing
+        """
+        if self.missing_column:
+            raise KeyError(self.missing_column)
+        return self.rows.get(code)
+
+
+def _load_codelist(path, code_column, description_column):
+    with path.open(encoding="utf-8") as f:
+        return Codelist(csv.DictReader(f), code_column)
+
+
+def _hash_file(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+schema_cache = SchemaCache()
+codelist_cache = FileCache(_load_codelist)
+content_cache = FileCache(_hash_file)
+
+
+class DescriptionCache:
+    """
+    Cache descriptions and the nodes rendered from them in a SQLite database, across builds and languages.
+
+    Entries are keyed on the digest of the file's contents and the description's location in the file, so that builds
+    can share a database, even if concurrent. Keys also contain the versions of the packages that render and pickle
+    the nodes, so that nodes aren't reused after an upgrade. The least recently used entries are evicted once the
+    entries' total size exceeds the maximum size.
+    """
+
+    def __init__(self, path=None, maxsize=64 * 1024 * 1024):
+        self.lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self.configure(path, maxsize)
+        self.reset()
+
+    def configure(self, path, maxsize):
+        #: The path to the SQLite database. If ``None``, descriptions are not cached.
+        self.path = path
+        #: The maximum total size of the entries, in bytes.
+        self.maxsize = maxsize
+        self.close()
 
+    def get(self, key):
+        """Return the description and its rendered nodes, or ``None``."""
+        if self.path is None:
+            return None
 
-@lru_cache
-def get_extension_explorer_extensions_json():
-    return requests.get("https://extensions.open-contracting.org/extensions.json", timeout=10).json()
+        key = self._key(key)
+        try:
+            with self.lock:
+                connection = self._connect()
+                row = connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row:
+                    connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logger.info("Description cache not readable: %s", e)
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            # The database is written only by this extension, like Sphinx's environment pickle.
+            value = pickle.loads(row[0])  # noqa: S301
+        # A truncated or corrupt entry can raise almost any exception.
+        except Exception as e:  # noqa: BLE001
+            logger.info("Description cache entry not readable, deleting: %s", e)
+            self._delete(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def set(self, key, description, children):
+        if self.path is None:
+            return
+
+        value = pickle.dumps((description, [child.deepcopy() for child in children]), pickle.HIGHEST_PROTOCOL)
+        try:
+            with self.lock:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (self._key(key), value, len(value), time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.info("Description cache not writable: %s", e)
+
+    def _delete(self, key):
+        try:
+            with self.lock:
+                self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.info("Description cache not writable: %s", e)
+
+    def evict(self):
+        """Delete the least recently used entries, until the entries' total size is within the maximum size."""
+        if self.path is None:
+            return
+
+        try:
+            with self.lock:
+                self._connect().execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM ("
+                    "SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total FROM entries"
+                    ") WHERE total > ?)",
+                    (self.maxsize,),
+                )
+        except sqlite3.Error as e:
+            logger.info("Description cache not writable: %s", e)
+
+    @cached_property
+    def versions(self):
+        """The versions of docutils, MyST-Parser and this extension."""
+        from importlib.metadata import PackageNotFoundError, version
+
+        versions = [docutils.__version__]
+        for name in ("myst-parser", "sphinxcontrib-opencontracting"):
+            try:
+                versions.append(version(name))
+            except PackageNotFoundError:
+                versions.append(None)
+        return versions
+
+    def _key(self, key):
+        return json.dumps([*self.versions, *key])
+
+    def _connect(self):
+        # Parallel builds fork processes, which mustn't share a connection.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit, and wait for concurrent builds' writes.
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+
+description_cache = DescriptionCache()
+
+
+def render_description(path, location, getter, *args):
+    """
+    Return the description and the nodes rendered from it, using the description cache.
+
+    ``location`` is the description's location in the file, and ``getter(*args)`` returns the description.
+
+    :raises OSError: if the file can't be read
+    """
+    key = (content_cache.get(path), *location)
+    entry = description_cache.get(key)
+    if entry is not None:
+        return entry
+
+    description = getter(*args)
+    children = to_docutils(description).children
+    description_cache.set(key, description, children)
+    return description, children
+
+
+def render_descriptions(path, items):
+    """
+    Return the nodes rendered from each description, using the description cache, and rendering the rest in one batch.
+
+    ``items`` is a list of descriptions' locations in the file and descriptions.
+
+    :raises OSError: if the file can't be read
+    """
+    digest = content_cache.get(path)
+    entries = [description_cache.get((digest, *location)) for location, _ in items]
+
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+    documents = markdown_cache.get_many([items[i][1] for i in missing])
+    for i, document in zip(missing, documents, strict=True):
+        location, description = items[i]
+        entries[i] = (description, document.children)
+        description_cache.set((digest, *location), description, document.children)
+
+    return [children for _, children in entries]
+
+
+def build_table(rows, classes, header=None):
+    """Return a two-column table, in which each row is a pair of lists of nodes."""
+    tgroup = nodes.tgroup(cols=2)
+    tgroup += nodes.colspec(colwidth=1)
+    tgroup += nodes.colspec(colwidth=3)
+    if header:
+        tgroup += nodes.thead("", nodes.row("", *(nodes.entry("", nodes.paragraph(text, text)) for text in header)))
+    tgroup += nodes.tbody("", *(nodes.row("", *(nodes.entry("", *cell) for cell in row)) for row in rows))
+    return nodes.table("", tgroup, classes=classes)
+
+
+def get_schema_description(path, pointer, *, follow_refs=False):
+    """
+    Return the description at the pointer in the JSON Schema file, following local ``$ref`` properties if set.
+
+    :raises OSError: if the file can't be read
+    :raises json.JSONDecodeError: if the file isn't valid JSON
+    :raises KeyError: if the pointer has no description
+    """
+    return get_descriptions(path, follow_refs=follow_refs)[pointer]
+
+
+def get_descriptions(path, *, follow_refs=False):
+    schema = schema_cache.get(path)
+    if follow_refs:
+        return schema.dereferenced_descriptions
+    return schema.descriptions
+
+
+def get_schema_descriptions(path, prefix, *, follow_refs=False):
+    """
+    Return the names and descriptions of the members at the pointer in the JSON Schema file, in file order.
+
+    Local ``$ref`` properties are followed if ``follow_refs`` is set.
+
+    :raises OSError: if the file can't be read
+    :raises json.JSONDecodeError: if the file isn't valid JSON
+    :raises KeyError: if no members at the pointer have descriptions
+    """
+    start = len(prefix) + 1
+    descriptions = [
+        (jsonpointer.unescape(pointer[start:]), description)
+        for pointer, description in get_descriptions(path, follow_refs=follow_refs).items()
+        if pointer.startswith(f"{prefix}/") and "/" not in pointer[start:]
+    ]
+    if not descriptions:
+        raise KeyError(prefix)
+    return descriptions
+
+
+def get_codelist_description(path, code_column, description_column, code):
+    """
+    Return the description of the code in the CSV codelist file.
+
+    :raises OSError: if the file can't be read
+    :raises KeyError: if a column is missing
+    :raises LookupError: if the code isn't in the codelist
+    """
+    row = codelist_cache.get(path, code_column, description_column).get(code)
+    if row is None:
+        raise LookupError(code)
+    return row[description_column]
+
+
+def get_codelist_descriptions(path, code_column, description_column, codes=None):
+    """
+    Return the codes and descriptions in the CSV codelist file, in file order or in the order of ``codes``.
+
+    :raises OSError: if the file can't be read
+    :raises KeyError: if a column is missing
+    :raises LookupError: if a code isn't in the codelist
+    """
+    codelist = codelist_cache.get(path, code_column, description_column)
+    if codelist.missing_column:
+        raise KeyError(codelist.missing_column)
+    if codes is None:
+        codes = codelist.rows
+    descriptions = []
+    for code in codes:
+        row = codelist.get(code)
+        if row is None:
+            raise LookupError(code)
+        descriptions.append((code, row[description_column]))
+    return descriptions
+
+
+DESCRIPTION_GETTERS = {
+    "schema": get_schema_description,
+    "dereferenced_schema": partial(get_schema_description, follow_refs=True),
+    "codelist": get_codelist_description,
+    "schema_table": get_schema_descriptions,
+    "dereferenced_schema_table": partial(get_schema_descriptions, follow_refs=True),
+    "codelist_table": get_codelist_descriptions,
+}
+
+
+def get_digest(value):
+    if value is None:
+        return None
+    return hashlib.sha256(str(value).encode()).hexdigest()
+
+
+def note_description(env, key, description):
+    """
+    Record the digest of the description that the current document uses, or ``None`` if it couldn't be resolved.
+
+    The key's first item is a key of ``DESCRIPTION_GETTERS``, and its other items are that getter's arguments.
+    """
+    if not hasattr(env, DESCRIPTION_ENV_ATTRIBUTE):
+        setattr(env, DESCRIPTION_ENV_ATTRIBUTE, {})
+    getattr(env, DESCRIPTION_ENV_ATTRIBUTE).setdefault(env.docname, {})[key] = get_digest(description)
+
+
+def get_config_values(config):
+    """Return the configuration values that directives use, as they use them."""
+    language = config.overrides.get("language", "en")
+    return {
+        "extension_versions": config.extension_versions,
+        "codelist_headers": config.codelist_headers.get(language),
+    }
+
+
+def note_config(env, name):
+    """Record the digest of the configuration value that the current document uses."""
+    if not hasattr(env, CONFIG_ENV_ATTRIBUTE):
+        setattr(env, CONFIG_ENV_ATTRIBUTE, {})
+    value = get_config_values(env.config)[name]
+    getattr(env, CONFIG_ENV_ATTRIBUTE).setdefault(env.docname, {})[name] = get_digest(value)
+
+
+class ExtensionRegistryCache:
+    """
+    The core extension versions in ``extension_versions``, and their metadata, loaded once per build.
+
+    Errors are stored, and raised when the extension version or its metadata is accessed.
+
+    If ``persistent`` is set, like by :class:`Watcher`, the loaded data is kept across builds in the same process,
+    until the configuration changes or the HTTP cache's TTL expires.
+    """
+
+    def __init__(self):
+        #: Whether to keep the loaded data across builds.
+        self.persistent = False
+        #: The digest of the configuration from which the data is loaded.
+        self.source = None
+        self.clear()
+
+    def clear(self):
+        #: The error raised while reading the extension registry, if any.
+        self.error = None
+        #: The categories of all extensions in the extension registry.
+        self.categories = set()
+        #: The category (or error) of each identifier and version.
+        self.versions = {}
+        #: The metadata (or error) of each identifier and version.
+        self.metadata = {}
+        #: The URL of the release schema patch (or error) of each identifier and version.
+        self.schema_urls = {}
+        #: The release schema patch (or ``None``, if none) of each identifier and version, once retrieved.
+        self.release_schemas = {}
+        #: The Extension Explorer's names of each identifier and version.
+        self.explorer_names = {}
+        #: The error raised while reading the Extension Explorer, if any.
+        self.explorer_error = None
+        #: Whether the extension registry or an extension lockfile is loaded.
+        self.loaded = False
+        #: The monotonic time at which the data was loaded.
+        self.loaded_at = None
+        #: The path to the extension lockfile, if loaded.
+        self.path = None
+
+    def load(self, extension_versions, max_workers, registry_url=None, explorer_url=None):
+        """
+        Read the extension registry and the Extension Explorer, and fetch the extensions' metadata concurrently.
+
+        :param registry_url: the base URL of the extension registry's CSV files, if not ``url_prefix``
+        :param explorer_url: the URL of the Extension Explorer's extensions.json file, if not
+            ``extension_explorer_extensions_url``
+        """
+        import requests
+        from ocdsextensionregistry import ExtensionRegistry
+        from ocdsextensionregistry.exceptions import DoesNotExist
+
+        self.clear()
+
+        if registry_url:
+            versions_url = f"{registry_url}extension_versions.csv"
+            extensions_csv_url = f"{registry_url}extensions.csv"
+        else:
+            versions_url = extension_versions_url
+            extensions_csv_url = extensions_url
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            explorer_future = executor.submit(get_extension_explorer_names, extension_versions, explorer_url)
+
+            try:
+                registry = ExtensionRegistry(
+                    http_cache.get(versions_url).decode(), http_cache.get(extensions_csv_url).decode()
+                )
+            except requests.RequestException as e:
+                self.error = e
+            else:
+                self.categories = {version.category for version in registry}
+
+                for identifier, version in extension_versions.items():
+                    try:
+                        extension = registry.get(id=identifier, core=True, version=version)
+                    except DoesNotExist as e:
+                        self.versions[(identifier, version)] = e
+                        self.schema_urls[(identifier, version)] = e
+                    else:
+                        self.versions[(identifier, version)] = extension.category
+                        self.schema_urls[(identifier, version)] = extension.get_url("release-schema.json")
+                        futures[(identifier, version)] = executor.submit(get_extension_metadata, extension)
+
+        for key, future in futures.items():
+            try:
+                self.metadata[key] = future.result()
+            except requests.RequestException as e:
+                self.metadata[key] = e
+
+        try:
+            self.explorer_names = explorer_future.result()
+        except requests.RequestException as e:
+            self.explorer_error = e
+
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    def load_lockfile(self, path, extension_versions):
+        """
+        Read the extension versions from a lockfile written by the ``ocds-lock`` builder.
+
+        :raises Error: if the lockfile is missing or doesn't match ``extension_versions``
+        """
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise Error(f"Extension lockfile not found: {path}") from None
+
+        if data["extension_versions"] != extension_versions:
+            raise Error(f"extension_versions in conf.py doesn't match the extension lockfile: {path}")
+
+        self.clear()
+        self.categories = set(data["categories"])
+        for identifier, extension in data["extensions"].items():
+            key = (identifier, extension["version"])
+            self.versions[key] = extension["category"]
+            self.metadata[key] = {"name": extension["name"], "description": extension["description"]}
+            self.explorer_names[key] = extension["explorer_name"]
+            if "release_schema_url" in extension:
+                self.schema_urls[key] = extension["release_schema_url"]
+            if "release_schema" in extension:
+                self.release_schemas[key] = extension["release_schema"]
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+        self.path = path.resolve()
+
+    def dump_lockfile(self, path, extension_versions):
+        """
+        Write the extension versions to a lockfile.
+
+        :raises Error: if an extension version or its metadata couldn't be retrieved
+        """
+        import requests
+        from ocdsextensionregistry.exceptions import DoesNotExist
+
+        extensions = {}
+        for identifier, version in extension_versions.items():
+            try:
+                metadata = self.get_metadata(identifier, version)
+                explorer_name = self.get_explorer_name(identifier, version)
+                extensions[identifier] = {
+                    "version": version,
+                    "category": self.get_category(identifier, version),
+                    "name": metadata["name"],
+                    "description": metadata["description"],
+                    "explorer_name": explorer_name,
+                    "explorer_url": {
+                        language: extension_explorer_template.format(language, identifier, version)
+                        for language in explorer_name
+                    },
+                    "release_schema_url": self.get_release_schema_url(identifier, version),
+                    "release_schema": self.get_release_schema(identifier, version),
+                }
+            except (DoesNotExist, KeyError, ValueError, requests.RequestException) as e:
+                raise Error(f"{identifier}=={version} couldn't be locked: {e}") from e
+
+        data = {
+            "extension_versions": extension_versions,
+            "categories": sorted(self.categories),
+            "extensions": extensions,
+        }
+
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    def is_current(self, source, ttl):
+        """Return whether the loaded data can be reused by a build with the configuration's digest."""
+        return self.persistent and self.loaded and self.source == source and time.monotonic() - self.loaded_at < ttl
+
+    def discard(self, paths):
+        """Clear the loaded data, if the extension lockfile is one of the paths."""
+        if self.path and self.path in {Path(path).resolve() for path in paths}:
+            self.clear()
+
+    def get_category(self, identifier, version):
+        """
+        Return the extension version's category.
+
+        :raises requests.RequestException: if the extension registry couldn't be read
+        :raises ocdsextensionregistry.exceptions.DoesNotExist: if the extension version isn't a core extension
+        """
+        return self._get(self.versions, identifier, version)
+
+    def get_metadata(self, identifier, version):
+        """
+        Return the extension version's metadata.
+
+        :raises requests.RequestException: if the metadata couldn't be retrieved
+        """
+        return self._get(self.metadata, identifier, version)
+
+    def get_release_schema_url(self, identifier, version):
+        """
+        Return the URL of the extension version's release schema patch.
+
+        :raises requests.RequestException: if the extension registry couldn't be read
+        :raises ocdsextensionregistry.exceptions.DoesNotExist: if the extension version isn't a core extension
+        :raises KeyError: if the extension lockfile has no URL for the extension version
+        """
+        return self._get(self.schema_urls, identifier, version)
+
+    def get_release_schema(self, identifier, version):
+        """
+        Return the extension version's release schema patch, or ``None`` if it has none.
+
+        If an extension lockfile is loaded, the patch is read from the lockfile, without a request.
+
+        :raises requests.RequestException: if the extension registry or the patch couldn't be read
+        :raises ocdsextensionregistry.exceptions.DoesNotExist: if the extension version isn't a core extension
+        :raises KeyError: if the extension lockfile has no patch for the extension version
+        :raises ValueError: if the patch isn't valid JSON
+        """
+        import requests
+
+        key = (identifier, version)
+        if key in self.release_schemas:
+            return self.release_schemas[key]
+        if self.path:
+            raise KeyError(f"{identifier}=={version} has no release_schema in the extension lockfile")
+
+        try:
+            patch = json.loads(http_cache.get(self.get_release_schema_url(identifier, version)))
+        except requests.HTTPError as e:
+            # Extensions without new fields have no release schema patch.
+            if e.response is None or e.response.status_code != requests.codes.not_found:
+                raise
+            patch = None
+        self.release_schemas[key] = patch
+        return patch
+
+    def get_explorer_name(self, identifier, version):
+        """
+        Return the extension version's names in the Extension Explorer.
+
+        :raises requests.RequestException: if the Extension Explorer couldn't be read
+        :raises KeyError: if the extension version isn't in the Extension Explorer
+        """
+        if self.explorer_error:
+            raise self.explorer_error
+        return self.explorer_names[(identifier, version)]
+
+    def _get(self, values, identifier, version):
+        if self.error:
+            raise self.error
+        value = values[(identifier, version)]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+extension_registry_cache = ExtensionRegistryCache()
 
 
 class Error(SphinxError):
     category = "sphinxcontrib-opencontracting error"
 
 
-class FieldDescription(Directive):
+class ProfileCache:
+    """
+    Merge the release schema patches of extension versions into a JSON Schema file, and cache the result on disk.
+
+    Merged files are keyed on the digest of the JSON Schema file and the extension versions, so that they are merged
+    once, until either changes, and so that builds can share a directory, even if concurrent. The least recently used
+    files are evicted once the files' total size exceeds the maximum size.
+    """
+
+    def __init__(self, directory=None, maxsize=64 * 1024 * 1024):
+        self.lock = threading.Lock()
+        self.configure(directory, maxsize)
+        self.reset()
+
+    def configure(self, directory, maxsize):
+        #: The directory in which to cache merged files.
+        self.directory = directory
+        #: The maximum total size of the files, in bytes.
+        self.maxsize = maxsize
+
+    def get(self, path, extension_versions):
+        """
+        Return the path to the JSON Schema file merged with the extension versions' release schema patches.
+
+        The extension versions must be loaded in ``extension_registry_cache``. If it loaded an extension lockfile, the
+        patches are read from the lockfile.
+
+        :raises OSError: if the file can't be read
+        :raises json.JSONDecodeError: if the file isn't valid JSON
+        :raises Error: if an extension version's release schema patch couldn't be retrieved
+        """
+        import json_merge_patch
+        import requests
+        from ocdsextensionregistry.exceptions import DoesNotExist
+        from ocdsextensionregistry.util import remove_nulls
+
+        key = json.dumps([content_cache.get(path), list(extension_versions.items())])
+        merged = self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+        # Merge once, if directives run concurrently.
+        with self.lock:
+            if merged.exists():
+                # Mark the file as recently used.
+                with suppress(OSError):
+                    os.utime(merged)
+                self.hits += 1
+                return merged
+            self.misses += 1
+
+            with path.open(encoding="utf-8") as f:
+                schema = json.load(f)
+
+            for identifier, version in extension_versions.items():
+                try:
+                    patch = extension_registry_cache.get_release_schema(identifier, version)
+                except (DoesNotExist, KeyError, ValueError, requests.RequestException) as e:
+                    raise Error(f"{identifier}=={version} couldn't be merged: {e}") from e
+                if patch is None:
+                    continue
+                # Remove null, because removing fields or properties is prohibited. Copy, to not change the cache.
+                patch = copy.deepcopy(patch)
+                remove_nulls(patch)
+                json_merge_patch.merge(schema, patch)
+
+            _write(merged, json.dumps(schema, ensure_ascii=False, indent=2).encode())
+
+        return merged
+
+    def evict(self):
+        """Delete the least recently used files, until the files' total size is within the maximum size."""
+        if self.directory is None:
+            return
+
+        files = []
+        for file in self.directory.glob("*.json"):
+            # Another build might have deleted the file.
+            with suppress(OSError):
+                stat = file.stat()
+                files.append((stat.st_mtime, file.name, stat.st_size, file))
+
+        total = 0
+        for _, _, size, file in sorted(files, reverse=True):
+            total += size
+            if total > self.maxsize:
+                file.unlink(missing_ok=True)
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+
+profile_cache = ProfileCache()
+
+
+def note_error(env, lineno, message):
+    if not hasattr(env, ERROR_ENV_ATTRIBUTE):
+        setattr(env, ERROR_ENV_ATTRIBUTE, {})
+    getattr(env, ERROR_ENV_ATTRIBUTE).setdefault(env.docname, []).append((lineno, message))
+
+
+class CheckedDirective(Directive):
+    """A directive whose errors and warnings are recorded in the environment, for the ``ocds-check`` builder."""
+
+    def directive_error(self, level, message):
+        if level >= Reporter.WARNING_LEVEL:
+            note_error(self.state.document.settings.env, self.lineno, message)
+        return super().directive_error(level, message)
+
+
+class FieldDescription(CheckedDirective):
     required_arguments = 2
+    option_spec = {"profile": directives.flag}
 
+    @profiled
     def run(self):
         filename = self.arguments[0]
         pointer = self.arguments[1]
 
         env = self.state.document.settings.env
         path = Path(env.doc2path(env.docname)).parent / filename
-        env.note_dependency(path)
+        kind = "dereferenced_schema" if env.config.opencontracting_follow_refs else "schema"
 
+        if "profile" in self.options:
+            note_config(env, "extension_versions")
+            # The merged file is named after the digest of this file, so changes to this file are noted separately.
+            try:
+                note_description(env, (kind, str(path), pointer), DESCRIPTION_GETTERS[kind](path, pointer))
+            except (OSError, ValueError, KeyError):
+                note_description(env, (kind, str(path), pointer), None)
+
+        description = None
         try:
-            with path.open(encoding="utf-8") as f:
-                schema = json.load(f)
-                description = jsonpointer.resolve_pointer(schema, f"{pointer}/description")
+            if "profile" in self.options:
+                if env.config.extension_versions:
+                    ensure_extension_registry(env.config)
+                path = profile_cache.get(path, env.config.extension_versions)
+            description, children = render_description(path, (kind, pointer), DESCRIPTION_GETTERS[kind], path, pointer)
+        except Error as e:
+            raise self.error(str(e)) from None
         except FileNotFoundError:
             raise self.error(f"JSON Schema file not found: {path}") from None
         except PermissionError:
             raise self.error(f"JSON Schema file not readable: {path}") from None
         except json.JSONDecodeError:
             raise self.error(f"JSON Schema file not valid: {path}") from None
-        except jsonpointer.JsonPointerException:
+        except KeyError:
             raise self.error(f"Pointer '{pointer}/description' not found: {path}") from None
+        finally:
+            note_description(env, (kind, str(path), pointer), description)
 
-        block_quote = nodes.block_quote(
-            "", *to_docutils(description).children, classes=["directive--field-description"]
-        )
+        block_quote = nodes.block_quote("", *children, classes=["directive--field-description"])
 
         return [block_quote]
 
 
-class CodeDescription(Directive):
+class CodeDescription(CheckedDirective):
     required_arguments = 2
 
+    @profiled
     def run(self):
         config = self.state.document.settings.env.config
         language = config.overrides.get("language", "en")
+        note_config(self.state.document.settings.env, "codelist_headers")
         try:
             headers = config.codelist_headers[language]
         except KeyError:
@@ -91,40 +1444,141 @@ class CodeDescription(Directive):
 
         env = self.state.document.settings.env
         path = Path(env.doc2path(env.docname)).parent / filename
-        env.note_dependency(path)
 
+        description = None
         try:
-            with path.open(encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                description = next(row[headers["description"]] for row in reader if row[headers["code"]] == code)
+            description, children = render_description(
+                path,
+                ("codelist", headers["code"], headers["description"], code),
+                get_codelist_description,
+                path,
+                headers["code"],
+                headers["description"],
+                code,
+            )
         except FileNotFoundError:
             raise self.error(f"CSV codelist file not found: {path}") from None
         except PermissionError:
             raise self.error(f"CSV codelist file not readable: {path}") from None
         except KeyError as e:
-            raise self.error(f"Column {e} not found ({', '.join(reader.fieldnames)}): {path}") from None
-        except StopIteration:
+            fieldnames = codelist_cache.get(path, headers["code"], headers["description"]).fieldnames
+            raise self.error(f"Column {e} not found ({', '.join(fieldnames)}): {path}") from None
+        except LookupError:
             raise self.error(f"Value '{code}' not found in column '{headers['code']}': {path}") from None
+        finally:
+            note_description(env, ("codelist", str(path), headers["code"], headers["description"], code), description)
 
-        block_quote = nodes.block_quote(
-            "", *to_docutils(description).children, classes=["directive--code-description"]
-        )
+        block_quote = nodes.block_quote("", *children, classes=["directive--code-description"])
 
         return [block_quote]
 
 
-class ExtensionExplorerLinkList(Directive):
+class FieldDescriptionTable(CheckedDirective):
+    required_arguments = 2
+
+    @profiled
+    def run(self):
+        filename = self.arguments[0]
+        prefix = self.arguments[1]
+
+        env = self.state.document.settings.env
+        path = Path(env.doc2path(env.docname)).parent / filename
+        kind = "dereferenced_schema" if env.config.opencontracting_follow_refs else "schema"
+
+        descriptions = None
+        try:
+            descriptions = DESCRIPTION_GETTERS[f"{kind}_table"](path, prefix)
+            rendered = render_descriptions(
+                path,
+                [((kind, f"{prefix}/{jsonpointer.escape(name)}"), text) for name, text in descriptions],
+            )
+        except FileNotFoundError:
+            raise self.error(f"JSON Schema file not found: {path}") from None
+        except PermissionError:
+            raise self.error(f"JSON Schema file not readable: {path}") from None
+        except json.JSONDecodeError:
+            raise self.error(f"JSON Schema file not valid: {path}") from None
+        except KeyError:
+            raise self.error(f"Pointer '{prefix}/*/description' not found: {path}") from None
+        finally:
+            note_description(env, (f"{kind}_table", str(path), prefix), descriptions)
+
+        rows = [
+            ([nodes.paragraph("", "", nodes.literal(name, name))], children)
+            for (name, _), children in zip(descriptions, rendered, strict=True)
+        ]
+
+        return [build_table(rows, ["directive--field-description-table"])]
+
+
+class CodelistTable(CheckedDirective):
+    required_arguments = 1
+    option_spec = {"codes": directives.unchanged}
+
+    @profiled
+    def run(self):
+        config = self.state.document.settings.env.config
+        language = config.overrides.get("language", "en")
+        note_config(self.state.document.settings.env, "codelist_headers")
+        try:
+            headers = config.codelist_headers[language]
+        except KeyError:
+            raise self.error(f"codelist_headers in conf.py is missing a '{language}' key") from None
+
+        filename = self.arguments[0]
+        codes = self.options.get("codes")
+        if codes is not None:
+            codes = tuple(code.strip() for code in codes.split(","))
+
+        env = self.state.document.settings.env
+        path = Path(env.doc2path(env.docname)).parent / filename
+
+        descriptions = None
+        try:
+            descriptions = get_codelist_descriptions(path, headers["code"], headers["description"], codes)
+            rendered = render_descriptions(
+                path,
+                [
+                    (("codelist", headers["code"], headers["description"], code), description)
+                    for code, description in descriptions
+                ],
+            )
+        except FileNotFoundError:
+            raise self.error(f"CSV codelist file not found: {path}") from None
+        except PermissionError:
+            raise self.error(f"CSV codelist file not readable: {path}") from None
+        except KeyError as e:
+            fieldnames = codelist_cache.get(path, headers["code"], headers["description"]).fieldnames
+            raise self.error(f"Column {e} not found ({', '.join(fieldnames)}): {path}") from None
+        except LookupError as e:
+            raise self.error(f"Value '{e.args[0]}' not found in column '{headers['code']}': {path}") from None
+        finally:
+            note_description(
+                env, ("codelist_table", str(path), headers["code"], headers["description"], codes), descriptions
+            )
+
+        rows = [
+            ([nodes.paragraph("", "", nodes.literal(code, code))], children)
+            for (code, _), children in zip(descriptions, rendered, strict=True)
+        ]
+
+        return [build_table(rows, ["directive--codelist-table"], header=(headers["code"], headers["description"]))]
+
+
+class ExtensionExplorerLinkList(CheckedDirective):
+    @profiled
     def run(self):
         config = self.state.document.settings.env.config
         extension_versions = config.extension_versions
         language = config.overrides.get("language", "en")
+        note_config(self.state.document.settings.env, "extension_versions")
+        ensure_extension_registry(config)
 
         items = []
-        extensions = get_extension_explorer_extensions_json()
 
         for identifier, version in extension_versions.items():
             try:
-                name = extensions[identifier]["versions"][version]["metadata"]["name"]
+                name = extension_registry_cache.get_explorer_name(identifier, version)
             except KeyError:
                 raise self.error(f"{identifier}=={version} is not in the extension registry") from None
 
@@ -145,15 +1599,21 @@ class ExtensionExplorerLinkList(Directive):
         return [nodes.bullet_list("", *items)]
 
 
-class ExtensionList(Directive):
+class ExtensionList(CheckedDirective):
     required_arguments = 1
     final_argument_whitespace = True
     option_spec = {"class": directives.class_option, "name": directives.unchanged, "list": directives.unchanged}
 
+    @profiled
     def run(self):
+        import requests
+        from ocdsextensionregistry.exceptions import DoesNotExist
+
         config = self.state.document.settings.env.config
         extension_versions = config.extension_versions
         language = config.overrides.get("language", "en")
+        note_config(self.state.document.settings.env, "extension_versions")
+        ensure_extension_registry(config)
 
         extension_list_name = self.options.pop("list", "")
         normalize_options(self.options)
@@ -181,17 +1641,18 @@ class ExtensionList(Directive):
         # Only list core extensions whose version matches the version specified in `conf.py` and whose category matches
         # the category specified by the directive's `list` option.
 
-        registry = ExtensionRegistry(extension_versions_url, extensions_url)
-
         num = 0
         for identifier, version in extension_versions.items():
-            extension = registry.get(id=identifier, core=True, version=version)
-            if extension_list_name and extension.category != extension_list_name:
+            try:
+                category = extension_registry_cache.get_category(identifier, version)
+            except DoesNotExist:
+                raise self.error(f"{identifier}=={version} is not in the extension registry") from None
+            if extension_list_name and category != extension_list_name:
                 continue
 
             # Avoid "403 Client Error: rate limit exceeded for url" on development branches.
             try:
-                metadata = extension.metadata
+                metadata = extension_registry_cache.get_metadata(identifier, version)
             except requests.HTTPError:
                 if live_branch:
                     raise
@@ -218,7 +1679,7 @@ class ExtensionList(Directive):
             text.line = num + 1
             definition_list += nodes.definition(description, text)
 
-        if extension_list_name and not registry.filter(category=extension_list_name):
+        if extension_list_name and extension_list_name not in extension_registry_cache.categories:
             raise self.warning(f"No extensions have category {extension_list_name} in extensionlist directive")
 
         admonition_node += definition_list
@@ -252,15 +1713,83 @@ def depart_worked_example(self, node):
     self.depart_paragraph(node)
 
 
+class WorkedExampleRecord(NamedTuple):
+    """A worked example, as stored in the environment."""
+
+    docname: str
+    lineno: int
+    #: The ID of the worked example's target, to link to.
+    target_id: str
+    title: str
+    tags: tuple[str, ...]
+
+
+class WorkedExamples:
+    """The worked examples in the environment, indexed by document and by tag."""
+
+    def __init__(self):
+        #: The worked examples in each document.
+        self.by_docname = {}
+        #: The worked examples with each tag, by document.
+        self.by_tag = {}
+        #: The tags of the workedexamplelist directives in each document.
+        self.lists = {}
+
+    def __len__(self):
+        return sum(len(examples) for examples in self.by_docname.values())
+
+    def add(self, example):
+        self.by_docname.setdefault(example.docname, []).append(example)
+        for tag in example.tags:
+            self.by_tag.setdefault(tag, {}).setdefault(example.docname, []).append(example)
+
+    def add_list(self, docname, tag):
+        self.lists.setdefault(docname, []).append(tag)
+
+    def tagged(self, tag):
+        """Return the worked examples with the tag, in document order."""
+        by_docname = self.by_tag.get(tag, {})
+        # Sort, so that the order doesn't depend on the order in which documents were read or merged.
+        return [example for docname in sorted(by_docname) for example in by_docname[docname]]
+
+    def purge(self, docname):
+        examples = self.by_docname.pop(docname, ())
+        for tag in {tag for example in examples for tag in example.tags}:
+            by_docname = self.by_tag[tag]
+            del by_docname[docname]
+            if not by_docname:
+                del self.by_tag[tag]
+        self.lists.pop(docname, None)
+
+    def merge(self, other, docnames):
+        # The other environment also contains the worked examples of documents that were read before it was forked.
+        for docname in docnames:
+            for example in other.by_docname.get(docname, ()):
+                self.add(example)
+            for tag in other.lists.get(docname, ()):
+                self.add_list(docname, tag)
+
+
+def get_worked_examples(env):
+    if not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
+        setattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE, WorkedExamples())
+    return getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE)
+
+
 class WorkedExampleList(Directive):
     required_arguments = 1
     final_argument_whitespace = True
     option_spec = {"tag": directives.unchanged}
 
+    @profiled
     def run(self):
+        env = self.state.document.settings.env
+
         title = self.arguments[0]
         tag = self.options.pop("tag", "")
 
+        get_worked_examples(env).add_list(env.docname, tag)
+
         return [worked_example_list(tag=tag, title=title)]
 
 
@@ -269,6 +1798,7 @@ class WorkedExample(Directive):
     final_argument_whitespace = True
     option_spec = {"tags": directives.unchanged}
 
+    @profiled
     def run(self):
         env = self.state.document.settings.env
 
@@ -280,46 +1810,31 @@ class WorkedExample(Directive):
 
         node = worked_example()
 
-        if not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-            setattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE, [])
-
-        getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE).append(
-            {
-                "docname": env.docname,
-                "lineno": self.lineno,
-                "target": target_node,
-                "title": title,
-                "tags": tags,
-            }
+        # Deduplicate tags, so that the worked example is listed once per tag.
+        get_worked_examples(env).add(
+            WorkedExampleRecord(env.docname, self.lineno, target_id, title, tuple(dict.fromkeys(tags.split(","))))
         )
 
         return [target_node, node]
 
 
 def purge_worked_examples(app, env, docname):
-    if not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-        return
-
-    setattr(
-        env,
-        WORKEDEXAMPLE_ENV_ATTRIBUTE,
-        [example for example in getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE) if example["docname"] != docname],
-    )
+    if hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
+        getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE).purge(docname)
 
 
 def merge_worked_examples(app, env, docnames, other):
-    if not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-        setattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE, [])
-
     if hasattr(other, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-        getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE).extend(getattr(other, WORKEDEXAMPLE_ENV_ATTRIBUTE))
+        get_worked_examples(env).merge(getattr(other, WORKEDEXAMPLE_ENV_ATTRIBUTE), docnames)
 
 
+@profiled
 def process_worked_example_nodes(app, doctree, fromdocname):
-    env = app.builder.env
+    worked_examples = get_worked_examples(app.builder.env)
 
-    if not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-        setattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE, [])
+    # Builders that assemble one doctree from many documents resolve it with the name of the root document.
+    if fromdocname not in worked_examples.lists and not hasattr(app.builder, "assemble_doctree"):
+        return
 
     for node in doctree.findall(worked_example_list):
         title = node["title"]
@@ -331,12 +1846,9 @@ def process_worked_example_nodes(app, doctree, fromdocname):
         admonition_node += title_node
 
         items = []
-        for example in getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE):
-            if tag not in example["tags"].split(","):
-                continue
-
-            uri = f"{app.builder.get_relative_uri(fromdocname, example['docname'])}#{example['target']['refid']}"
-            reference = nodes.reference("", example["title"], refuri=uri)
+        for example in worked_examples.tagged(tag):
+            uri = f"{app.builder.get_relative_uri(fromdocname, example.docname)}#{example.target_id}"
+            reference = nodes.reference("", example.title, refuri=uri)
             reference["translatable"] = True
 
             paragraph = nodes.paragraph("", "", reference)
@@ -350,14 +1862,534 @@ def process_worked_example_nodes(app, doctree, fromdocname):
         node.replace_self(admonition_node)
 
 
+def purge_document_data(app, env, docname):
+    for attribute in (DESCRIPTION_ENV_ATTRIBUTE, CONFIG_ENV_ATTRIBUTE, ERROR_ENV_ATTRIBUTE):
+        if hasattr(env, attribute):
+            getattr(env, attribute).pop(docname, None)
+
+
+def merge_document_data(app, env, docnames, other):
+    for attribute in (DESCRIPTION_ENV_ATTRIBUTE, CONFIG_ENV_ATTRIBUTE, ERROR_ENV_ATTRIBUTE):
+        if hasattr(other, attribute):
+            if not hasattr(env, attribute):
+                setattr(env, attribute, {})
+            for docname in docnames:
+                if docname in getattr(other, attribute):
+                    getattr(env, attribute)[docname] = getattr(other, attribute)[docname]
+
+
+def get_outdated_descriptions(app, env, added, changed, removed):
+    """Return the documents that use a description that changed, instead of every document that uses the file."""
+    digests = {}
+    outdated = []
+    for docname, keys in getattr(env, DESCRIPTION_ENV_ATTRIBUTE, {}).items():
+        if docname in changed or docname in removed:
+            continue
+        for key, digest in keys.items():
+            if key not in digests:
+                try:
+                    digests[key] = get_digest(DESCRIPTION_GETTERS[key[0]](*key[1:]))
+                except (OSError, ValueError, LookupError):
+                    digests[key] = None
+            if digests[key] != digest:
+                outdated.append(docname)
+                break
+    return outdated
+
+
+def get_outdated_config(app, env, added, changed, removed):
+    """Return the documents that use a configuration value that changed, instead of every document."""
+    digests = {name: get_digest(value) for name, value in get_config_values(app.config).items()}
+    return [
+        docname
+        for docname, names in getattr(env, CONFIG_ENV_ATTRIBUTE, {}).items()
+        if docname not in changed
+        and docname not in removed
+        and any(digests[name] != digest for name, digest in names.items())
+    ]
+
+
+def prescan(app, env, docnames):
+    """
+    Scan the documents to read for directives, and load the files and extension registry that they use concurrently.
+
+    Directives then look up the loaded data, instead of loading it one directive at a time. Errors are ignored, to be
+    reported by the directives.
+    """
+    if not app.config.opencontracting_prescan or not docnames:
+        return
+
+    headers = app.config.codelist_headers.get(app.config.overrides.get("language", "en"), {})
+
+    start = time.perf_counter()
+    with profiler.time("prescan"):
+        tasks = set()
+        registry = False
+        for docname in docnames:
+            path = Path(env.doc2path(docname))
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+
+            for match in prescan_pattern.finditer(text):
+                name = match[1] or match[2]
+                arguments = match[3].split()
+                if name.startswith("extension"):
+                    registry = True
+                elif arguments:
+                    file = path.parent / arguments[0]
+                    tasks.add((content_cache.get, file))
+                    if name.startswith("field-description"):
+                        tasks.add((schema_cache.get, file))
+                    elif "code" in headers and "description" in headers:
+                        tasks.add((codelist_cache.get, file, headers["code"], headers["description"]))
+    prescanned = time.perf_counter()
+
+    with (
+        profiler.time("warm-up"),
+        ThreadPoolExecutor(max_workers=app.config.opencontracting_max_workers) as executor,
+    ):
+        if registry:
+            executor.submit(ensure_extension_registry, app.config)
+        for function, *args in tasks:
+            executor.submit(function, *args)
+    finished = time.perf_counter()
+
+    logger.verbose(
+        "Prescanned %d document(s) in %.3fs. Loaded %d file(s)%s in %.3fs",
+        len(docnames),
+        prescanned - start,
+        len({task[1] for task in tasks}),
+        " and the extension registry" if registry else "",
+        finished - prescanned,
+    )
+
+
+def get_cache_directory(app):
+    if app.config.opencontracting_cache_dir:
+        return Path(app.confdir) / app.config.opencontracting_cache_dir
+    return Path(app.doctreedir) / "opencontracting"
+
+
+def configure_http_cache(app):
+    http_cache.configure(get_cache_directory(app) / "http", app.config.opencontracting_http_cache_ttl)
+    transport.configure(
+        app.config.opencontracting_http_retries,
+        app.config.opencontracting_http_backoff,
+        app.config.opencontracting_http_max_connections,
+    )
+
+
+def configure_profile_cache(app):
+    profile_cache.configure(get_cache_directory(app) / "profiles", app.config.opencontracting_profile_cache_size)
+
+
+def configure_description_cache(app):
+    if app.config.opencontracting_description_cache_size:
+        path = get_cache_directory(app) / "descriptions.sqlite3"
+    else:
+        path = None
+    description_cache.configure(path, app.config.opencontracting_description_cache_size)
+
+
+def evict_description_cache(app, exception):
+    description_cache.evict()
+
+
+def evict_profile_cache(app, exception):
+    profile_cache.evict()
+
+
+def load_extension_registry(app):
+    """
+    Load the extension lockfile, if set. Otherwise, the extension registry is loaded by the prescan or on first use.
+
+    The ``ocds-lock`` builder doesn't read documents, so it loads the extension registry here.
+
+    If the extension registry cache is persistent, and the loaded data is current, it is reused.
+    """
+    config = app.config
+    source = get_digest(
+        (
+            tuple(config.extension_versions.items()),
+            config.opencontracting_extension_lockfile,
+            config.opencontracting_extension_registry_url,
+            config.opencontracting_extension_explorer_extensions_url,
+            app.builder.name == ExtensionLockBuilder.name,
+        )
+    )
+    if extension_registry_cache.is_current(source, config.opencontracting_http_cache_ttl):
+        return
+
+    extension_registry_cache.clear()
+    extension_registry_cache.source = source
+    if app.config.opencontracting_extension_lockfile and app.builder.name != ExtensionLockBuilder.name:
+        extension_registry_cache.load_lockfile(
+            Path(app.confdir) / app.config.opencontracting_extension_lockfile, app.config.extension_versions
+        )
+    elif app.builder.name == ExtensionLockBuilder.name:
+        ensure_extension_registry(app.config)
+
+
+def ensure_extension_registry(config):
+    """
+    Load the extension registry, if not already loaded.
+
+    The registry is loaded even if ``extension_versions`` is empty, because extensionlist checks its categories.
+    """
+    if not extension_registry_cache.loaded:
+        extension_registry_cache.load(
+            config.extension_versions,
+            config.opencontracting_max_workers,
+            config.opencontracting_extension_registry_url,
+            config.opencontracting_extension_explorer_extensions_url,
+        )
+
+
+class ExtensionLockBuilder(Builder):
+    """Write the extension versions in ``extension_versions`` to a lockfile, without reading documents."""
+
+    name = "ocds-lock"
+
+    def build_all(self):
+        if self.config.opencontracting_extension_lockfile:
+            lockfile = Path(self.confdir) / self.config.opencontracting_extension_lockfile
+        else:
+            lockfile = Path(self.outdir) / "extensions.lock.json"
+
+        lockfile.parent.mkdir(parents=True, exist_ok=True)
+        extension_registry_cache.dump_lockfile(lockfile, self.config.extension_versions)
+        logger.info("The extension lockfile is %s.", lockfile)
+
+    def build_specific(self, filenames):
+        self.build_all()
+
+    def build_update(self):
+        self.build_all()
+
+    def get_outdated_docs(self):
+        return []
+
+    def get_target_uri(self, docname, typ=None):
+        return ""
+
+    def write_doc(self, docname, doctree):
+        pass
+
+
+class CheckBuilder(Builder):
+    """
+    Check the references in directives, without writing documents.
+
+    The failures are written to ``check.json`` in the output directory, as a list of objects with ``docname``,
+    ``lineno`` and ``message`` keys. If there are failures, the build's exit status is 1.
+    """
+
+    name = "ocds-check"
+
+    def init(self):
+        #: The failures found by the build.
+        self.failures = []
+
+    def get_outdated_docs(self):
+        # Documents are read if changed, like any builder. Failures are recorded in the environment.
+        return []
+
+    def get_target_uri(self, docname, typ=None):
+        return ""
+
+    def prepare_writing(self, docnames):
+        pass
+
+    def write_documents(self, docnames):
+        # Documents aren't resolved, so workedexamplelist directives don't raise errors.
+        pass
+
+    def write_doc(self, docname, doctree):
+        pass
+
+    def finish(self):
+        failures = [
+            {"docname": docname, "lineno": lineno, "message": message}
+            for docname, errors in getattr(self.env, ERROR_ENV_ATTRIBUTE, {}).items()
+            for lineno, message in errors
+        ]
+
+        # workedexamplelist directives can only be checked once all documents are read.
+        worked_examples = get_worked_examples(self.env)
+        for docname, tags in worked_examples.lists.items():
+            failures.extend(
+                {"docname": docname, "lineno": None, "message": f"No worked examples are tagged with {tag}"}
+                for tag in tags
+                if not worked_examples.by_tag.get(tag)
+            )
+
+        self.failures = sorted(failures, key=lambda failure: (failure["docname"], failure["lineno"] or 0))
+
+        path = Path(self.outdir) / "check.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.failures, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+        if self.failures:
+            logger.info("%d references failed. The failures are in %s.", len(self.failures), path)
+        else:
+            logger.info("All references succeeded.")
+
+
+def set_check_status(app, exception):
+    if exception is None and app.builder.name == CheckBuilder.name and app.builder.failures:
+        app.statuscode = 1
+
+
+def get_cache_counters():
+    """Return the counters of each cache."""
+    counters = {
+        name: {"hits": cache.hits, "misses": cache.misses}
+        for name, cache in (
+            ("schema", schema_cache),
+            ("codelist", codelist_cache),
+            ("content", content_cache),
+            ("description", description_cache),
+            ("markdown", markdown_cache),
+            ("profile", profile_cache),
+        )
+    }
+    counters["http"] = {
+        "hits": http_cache.hits,
+        "revalidated": http_cache.revalidated,
+        "stale": http_cache.stale,
+        "misses": http_cache.misses,
+    }
+    return counters
+
+
+def configure_profiler(app):
+    profiler.clear()
+    profiler.enabled = app.config.opencontracting_profile
+
+
+def collect_profile(app, env, docnames):
+    if profiler.enabled:
+        profiler.collect()
+
+
+def drain_profile(app, doctree):
+    # The main process's samples are reported directly.
+    if profiler.enabled and os.getpid() != profiler.pid:
+        data = profiler.drain()
+        if hasattr(app.env, PROFILE_ENV_ATTRIBUTE):
+            getattr(app.env, PROFILE_ENV_ATTRIBUTE).append(data)
+        else:
+            setattr(app.env, PROFILE_ENV_ATTRIBUTE, [data])
+
+
+def merge_profile(app, env, docnames, other):
+    if profiler.enabled:
+        for data in getattr(other, PROFILE_ENV_ATTRIBUTE, ()):
+            profiler.merge(data)
+
+
+def write_profile(app, exception):
+    if not profiler.enabled or exception:
+        return
+
+    report = profiler.report()
+
+    path = Path(app.outdir) / "opencontracting-profile.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    logger.info("sphinxcontrib-opencontracting profile (written to %s):", path)
+    for name, timer in sorted(report["timers"].items(), key=lambda item: item[1]["total"], reverse=True):
+        logger.info(
+            "  %s: %d calls, %.3f s total, %.1f ms p95", name, timer["count"], timer["total"], timer["p95"] * 1000
+        )
+
+
+def reset_caches(app):
+    schema_cache.reset()
+    codelist_cache.reset()
+    content_cache.reset()
+    description_cache.reset()
+    markdown_cache.reset()
+    http_cache.reset()
+    transport.reset()
+    profile_cache.reset()
+    markdown_cache.resize(app.config.opencontracting_markdown_cache_size)
+    schema_cache.prune_size = app.config.opencontracting_schema_prune_size
+
+
+def report_caches(app, exception):
+    logger.verbose("JSON Schema cache: %d hits, %d misses", schema_cache.hits, schema_cache.misses)
+    logger.verbose("CSV codelist cache: %d hits, %d misses", codelist_cache.hits, codelist_cache.misses)
+    logger.verbose("Description cache: %d hits, %d misses", description_cache.hits, description_cache.misses)
+    logger.verbose("Markdown cache: %d hits, %d misses", markdown_cache.hits, markdown_cache.misses)
+    logger.verbose("Profile schema cache: %d hits, %d misses", profile_cache.hits, profile_cache.misses)
+    logger.verbose(
+        "HTTP cache: %d hits, %d revalidated, %d stale, %d misses",
+        http_cache.hits,
+        http_cache.revalidated,
+        http_cache.stale,
+        http_cache.misses,
+    )
+    for host, stats in sorted(transport.hosts.items()):
+        logger.verbose(
+            "HTTP requests to %s: %d requests, %d retries, %d errors, %.3fs",
+            host,
+            stats["requests"],
+            stats["retries"],
+            stats["errors"],
+            stats["seconds"],
+        )
+
+
+def invalidate_caches(paths):
+    """Remove the entries of the files at the paths from the caches that are kept in memory across builds."""
+    # A changed file might be a symbolic link.
+    _realpath.cache_clear()
+    for cache in (schema_cache, codelist_cache, content_cache):
+        cache.discard(paths)
+    extension_registry_cache.discard(paths)
+
+
+class Watcher:
+    """
+    Build a Sphinx project, and rebuild it in the same process each time its files change.
+
+    This extension's caches are module-level, so they stay in memory across builds: parsed JSON Schema files, indexed
+    CSV codelists, rendered Markdown and the extension registry, as well as the imported dependencies. Before each
+    rebuild, only the entries of the files that changed are removed.
+    """
+
+    def __init__(self, argv, paths=(), ignore=(), interval=0.5):
+        """
+        Read the directories to watch and not to watch from the arguments to ``sphinx-build``.
+
+        :param argv: the arguments to ``sphinx-build``
+        :param paths: other files and directories to watch, in addition to the source directory
+        :param ignore: directories not to watch
+        :param interval: the number of seconds between checks for changes
+        """
+        from sphinx.cmd.build import get_parser
+
+        args = get_parser().parse_args(argv)
+        outdir = Path(args.outputdir).resolve()
+
+        self.argv = list(argv)
+        #: The files and directories to watch.
+        self.paths = [Path(args.sourcedir).resolve(), *(Path(path).resolve() for path in paths)]
+        #: The directories not to watch, including those that builds write to.
+        self.ignore = {
+            outdir,
+            Path(args.doctreedir).resolve() if args.doctreedir else outdir / ".doctrees",
+            *(Path(path).resolve() for path in ignore),
+        }
+        self.interval = interval
+        #: The modification time and size of each watched file, at the last check.
+        self.files = {}
+
+    def snapshot(self):
+        """Return the modification time and size of each watched file."""
+        files = {}
+        for root in self.paths:
+            candidates = [root] if root.is_file() else []
+            for directory, dirnames, filenames in os.walk(root):
+                directory = Path(directory)  # noqa: PLW2901
+                # Skip hidden directories, like .git.
+                dirnames[:] = [
+                    name for name in dirnames if not name.startswith(".") and directory / name not in self.ignore
+                ]
+                candidates.extend(directory / name for name in filenames)
+            for path in candidates:
+                try:
+                    stat = path.stat()
+                except OSError:  # removed while walking
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def poll(self):
+        """Return the paths of the files that were added, changed or removed since the last check."""
+        files = self.snapshot()
+        changed = {
+            path
+            for path in files.keys() | self.files.keys()
+            if files.get(path) != self.files.get(path) and self.ignore.isdisjoint(path.parents)
+        }
+        self.files = files
+        return changed
+
+    def build(self, changed=()):
+        """Remove the cache entries of the files that changed, build the project, and return the exit status."""
+        from sphinx.cmd.build import build_main
+
+        if changed:
+            logger.info("%d file(s) changed: %s", len(changed), ", ".join(sorted(map(str, changed))))
+            invalidate_caches(changed)
+
+        start = time.perf_counter()
+        status = build_main(self.argv)
+        logger.info("Built in %.3fs. Watching for changes...", time.perf_counter() - start)
+
+        # Don't watch this extension's cache directory, which builds write to, even if set in the source directory.
+        if http_cache.directory:
+            self.ignore.add(Path(http_cache.directory).parent.resolve())
+        return status
+
+    def run(self):
+        """Build the project, and rebuild it each time a file changes, until interrupted. Return the exit status."""
+        extension_registry_cache.persistent = True
+        status = 0
+        try:
+            self.poll()
+            status = self.build()
+            while True:
+                time.sleep(self.interval)
+                if changed := self.poll():
+                    status = self.build(changed)
+        except KeyboardInterrupt:
+            return status
+        finally:
+            extension_registry_cache.persistent = False
+
+
+def main(argv=None):
+    """Build a Sphinx project, and rebuild it each time its files change, keeping this extension's caches in memory."""
+    parser = argparse.ArgumentParser(
+        description=main.__doc__,
+        usage="%(prog)s [options] SOURCEDIR OUTPUTDIR [sphinx-build options]",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "--watch", action="append", default=[], metavar="PATH", help="another file or directory to watch"
+    )
+    parser.add_argument("--ignore", action="append", default=[], metavar="PATH", help="a directory not to watch")
+    parser.add_argument(
+        "--interval", type=float, default=0.5, metavar="SECONDS", help="the number of seconds between checks"
+    )
+    args, argv = parser.parse_known_args(argv)
+
+    return Watcher(argv, args.watch, args.ignore, args.interval).run()
+
+
 def setup(app):
     app.add_directive("field-description", FieldDescription)
     app.add_directive("code-description", CodeDescription)
+    app.add_directive("field-description-table", FieldDescriptionTable)
+    app.add_directive("codelist-table", CodelistTable)
     app.add_directive("extensionexplorerlinklist", ExtensionExplorerLinkList)
     app.add_directive("extensionlist", ExtensionList)
     app.add_directive("workedexample", WorkedExample)
     app.add_directive("workedexamplelist", WorkedExampleList)
 
+    app.add_builder(ExtensionLockBuilder)
+    app.add_builder(CheckBuilder)
+
     app.add_node(worked_example_list)
     app.add_node(
         worked_example,
@@ -369,8 +2401,28 @@ def setup(app):
     app.connect("doctree-resolved", process_worked_example_nodes)
     app.connect("env-purge-doc", purge_worked_examples)
     app.connect("env-merge-info", merge_worked_examples)
-
-    app.add_config_value("extension_versions", {}, rebuild=True)
+    app.connect("env-purge-doc", purge_document_data)
+    app.connect("env-merge-info", merge_document_data)
+    app.connect("env-get-outdated", get_outdated_descriptions)
+    app.connect("env-get-outdated", get_outdated_config)
+    app.connect("env-before-read-docs", prescan)
+    app.connect("builder-inited", reset_caches)
+    app.connect("builder-inited", configure_http_cache)
+    app.connect("builder-inited", configure_description_cache)
+    app.connect("builder-inited", configure_profile_cache)
+    app.connect("builder-inited", load_extension_registry)
+    app.connect("build-finished", report_caches)
+    app.connect("builder-inited", configure_profiler)
+    app.connect("env-before-read-docs", collect_profile)
+    app.connect("doctree-read", drain_profile)
+    app.connect("env-merge-info", merge_profile)
+    app.connect("build-finished", write_profile)
+    app.connect("build-finished", evict_description_cache)
+    app.connect("build-finished", evict_profile_cache)
+    app.connect("build-finished", set_check_status)
+
+    # Only the documents that use these values are re-read if they change. See get_outdated_config.
+    app.add_config_value("extension_versions", {}, rebuild="")
     app.add_config_value(
         "codelist_headers",
         {
@@ -379,5 +2431,33 @@ def setup(app):
             "fr": {"code": "Code", "description": "Description"},
             "it": {"code": "Codice", "description": "Descrizione"},
         },
-        rebuild=True,
+        rebuild="",
+    )
+    app.add_config_value("opencontracting_markdown_cache_size", 1024, rebuild="")
+    app.add_config_value("opencontracting_max_workers", 8, rebuild="")
+    app.add_config_value("opencontracting_cache_dir", None, rebuild="", types=(str, type(None)))
+    app.add_config_value("opencontracting_http_cache_ttl", 3600, rebuild="")
+    app.add_config_value("opencontracting_http_retries", 3, rebuild="")
+    app.add_config_value("opencontracting_http_backoff", 0.5, rebuild="", types=(int, float))
+    app.add_config_value("opencontracting_http_max_connections", 8, rebuild="")
+    app.add_config_value("opencontracting_description_cache_size", 64 * 1024 * 1024, rebuild="")
+    app.add_config_value("opencontracting_profile_cache_size", 64 * 1024 * 1024, rebuild="")
+    app.add_config_value("opencontracting_schema_prune_size", 1024 * 1024, rebuild="")
+    app.add_config_value("opencontracting_follow_refs", default=False, rebuild="env")
+    app.add_config_value("opencontracting_profile", default=False, rebuild="")
+    app.add_config_value("opencontracting_prescan", default=True, rebuild="")
+    app.add_config_value("opencontracting_extension_registry_url", None, rebuild="", types=(str, type(None)))
+    app.add_config_value(
+        "opencontracting_extension_explorer_extensions_url", None, rebuild="", types=(str, type(None))
     )
+    app.add_config_value("opencontracting_extension_lockfile", None, rebuild="", types=(str, type(None)))
+
+    # Caches are module-level, so each parallel process has its own. Environment state is merged in env-merge-info.
+    return {"env_version": 5, "parallel_read_safe": True, "parallel_write_safe": True}
+
+
+if __name__ == "__main__":
+    # Run the module that Sphinx imports as an extension, so that the caches it uses are the ones kept in memory.
+    from sphinxcontrib.opencontracting import main
+
+    sys.exit(main())
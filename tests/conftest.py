@@ -1 +1,149 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sphinxcontrib import opencontracting
+from tests import path
+
 pytest_plugins = "sphinx.testing.fixtures"
+
+#: A route that closes the connection without a response.
+DROP = "drop"
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep connections alive.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, self.headers))
+            self.server.connections.add(self.client_address)
+            count = len(self.server.requests)
+            route = self.server.routes.get(self.path, 404)
+            # A list of responses is served in order, and its last response is repeated.
+            if isinstance(route, list):
+                route = route.pop(0) if len(route) > 1 else route[0]
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.rate_limit is not None and count > self.server.rate_limit:
+            self.send_error(403, "rate limit exceeded")
+            return
+
+        if route == DROP:
+            self.close_connection = True
+            return
+        if isinstance(route, int):
+            self.send_error(route)
+            return
+
+        body, headers = route
+        if isinstance(body, int):
+            self.send_response(body)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if ("ETag" in headers and self.headers.get("If-None-Match") == headers["ETag"]) or (
+            "Last-Modified" in headers and self.headers.get("If-Modified-Since") == headers["Last-Modified"]
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        #: The response for each path: a status code, a body (or status code) and headers, ``DROP``, or a list.
+        self.routes = {}
+        #: The path and headers of each request.
+        self.requests = []
+        #: The client address of each connection.
+        self.connections = set()
+        #: The number of seconds to wait before each response.
+        self.latency = 0
+        #: The number of requests after which to respond with "403 rate limit exceeded", if any.
+        self.rate_limit = None
+        self.lock = threading.Lock()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+@pytest.fixture(autouse=True)
+def transport():
+    """Don't wait between retries."""
+    opencontracting.transport.configure(retries=3, backoff=0, max_connections=8)
+    opencontracting.transport.reset()
+    return opencontracting.transport
+
+
+@pytest.fixture
+def http_server():
+    server = Server()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def build_html(make_app, tmp_path):
+    """
+    Return a function that builds a project to HTML in ``tmp_path / "build"``, and asserts that there are no warnings.
+
+    The function accepts the source directory and ``make_app``'s keyword arguments, and returns the application and
+    the sorted names of the documents that were read.
+    """
+
+    def build(srcdir, **kwargs):
+        read = []
+        app = make_app(buildername="html", srcdir=srcdir, builddir=tmp_path / "build", **kwargs)
+        app.connect("env-before-read-docs", lambda *args: read.extend(args[2]))
+        app.build()
+        app.cleanup()
+        assert app.warning.getvalue() == ""
+        return app, sorted(read)
+
+    return build
+
+
+@pytest.fixture
+def registry(http_server):
+    """
+    Serve the extension registry and the Extension Explorer's extensions.json from the stand-in HTTP server.
+
+    Builds use the server if they set the configuration values in the server's ``confoverrides`` attribute.
+    """
+    directory = path("registry")
+    for file in directory.rglob("*"):
+        if file.is_file():
+            body = file.read_text(encoding="utf-8").replace("{base_url}", http_server.url("/"))
+            http_server.routes[f"/{file.relative_to(directory).as_posix()}"] = (body.encode(), {})
+
+    http_server.confoverrides = {
+        "opencontracting_extension_registry_url": http_server.url("/"),
+        "opencontracting_extension_explorer_extensions_url": http_server.url("/extensions.json"),
+        "opencontracting_http_backoff": 0,
+    }
+    return http_server
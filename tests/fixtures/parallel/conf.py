@@ -0,0 +1,2 @@
+extensions = ["sphinxcontrib.opencontracting"]
+exclude_patterns = ["_build"]
@@ -1,13 +1,42 @@
+import json
 import os
 import re
-from contextlib import contextmanager
+import shutil
+import sqlite3
+import time
+from contextlib import closing, contextmanager
 from pathlib import Path
 
 import lxml.html
 import pytest
+import requests
+from ocdsextensionregistry import ExtensionVersion
 
-from sphinxcontrib.opencontracting import WORKEDEXAMPLE_ENV_ATTRIBUTE, Error
+from sphinxcontrib.opencontracting import (
+    WORKEDEXAMPLE_ENV_ATTRIBUTE,
+    DescriptionCache,
+    Error,
+    ExtensionRegistryCache,
+    FileCache,
+    MarkdownCache,
+    ProfileCache,
+    Schema,
+    SchemaCache,
+    WorkedExampleRecord,
+    WorkedExamples,
+    codelist_cache,
+    description_cache,
+    get_extension_explorer_names,
+    get_extension_metadata,
+    http_cache,
+    markdown_cache,
+    prescan_pattern,
+    profile_cache,
+    schema_cache,
+    to_docutils,
+)
 from tests import path
+from tests.conftest import DROP
 
 
 def normalize(string):
@@ -18,7 +47,7 @@ def assert_build(app, status, warning, basename, messages=None):
     app.build()
     warnings = warning.getvalue().strip()
 
-    with path(basename, "_build", "html", "index.html").open(encoding="utf-8") as f:
+    with (Path(app.outdir) / "index.html").open(encoding="utf-8") as f:
         element = lxml.html.fromstring(f.read()).xpath('//div[@class="documentwrapper"]')[0]
         actual = lxml.html.tostring(element).decode()
 
@@ -65,6 +94,227 @@ def test_field_description(app, status, warning):
     )
 
 
+@pytest.mark.sphinx(
+    buildername="html",
+    srcdir=path("field-description"),
+    freshenv=True,
+    confoverrides={"opencontracting_description_cache_size": 0, "opencontracting_schema_prune_size": 0},
+)
+def test_field_description_pruned(app, status, warning):
+    basename = "field-description"
+    schema_cache.clear()
+
+    assert_build(
+        app,
+        status,
+        warning,
+        basename,
+        [
+            f"ERROR: JSON Schema file not found: {path(basename, 'nonexistent.json')}",
+            f"ERROR: JSON Schema file not valid: {path(basename, 'invalid.json')}",
+            f"ERROR: Pointer '/properties/nonexistent/description' not found: {path(basename, 'schema.json')}",
+        ],
+    )
+
+
+@pytest.mark.sphinx(
+    buildername="html",
+    srcdir=path("field-description"),
+    freshenv=True,
+    confoverrides={"opencontracting_description_cache_size": 0},
+)
+def test_field_description_cache(app, status, warning):
+    schema_cache.clear()
+
+    app.build()
+
+    # schema.json is loaded once by the prescan, for two directives. invalid.json fails, so its directive reloads it.
+    assert schema_cache.hits == 2
+    assert schema_cache.misses == 3
+
+
+def test_dereferenced_descriptions():
+    schema = Schema(
+        {
+            "properties": {
+                "tender": {"$ref": "#/definitions/Tender", "description": "The tender"},
+                "missing": {"$ref": "#/definitions/Missing"},
+            },
+            "definitions": {
+                "Tender": {
+                    "description": "A tender",
+                    "properties": {
+                        "id": {"description": "An identifier"},
+                        "parent": {"$ref": "#/definitions/Tender"},
+                    },
+                },
+            },
+        }
+    )
+
+    assert "/properties/tender/properties/id" not in schema.descriptions
+    assert schema.dereferenced_descriptions == {
+        # The subschema's own description is used.
+        "/properties/tender": "The tender",
+        "/properties/tender/properties/id": "An identifier",
+        "/definitions/Tender": "A tender",
+        "/definitions/Tender/properties/id": "An identifier",
+        # A $ref isn't followed again while following it.
+        "/definitions/Tender/properties/parent": "A tender",
+        "/definitions/Tender/properties/parent/properties/id": "An identifier",
+    }
+
+
+def test_check(make_app, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\n'
+        'extension_versions = {"bids": "v1.1.5", "nonexistent": "v1"}\n'
+    )
+    (srcdir / "index.rst").write_text(".. toctree::\n\n   a\n   b\n")
+    (srcdir / "a.rst").write_text(
+        "A\n=\n\n"
+        ".. field-description:: schema.json /properties/a\n\n"
+        ".. field-description:: schema.json /properties/nonexistent\n\n"
+        ".. code-description:: codelist.csv nonexistent\n\n"
+        ".. workedexample:: Example\n   :tags: tender\n\n"
+        ".. workedexamplelist:: Examples\n   :tag: tender\n"
+    )
+    (srcdir / "b.rst").write_text(
+        "B\n=\n\n.. extensionlist:: Extensions\n\n.. workedexamplelist:: Examples\n   :tag: nonexistent\n"
+    )
+    (srcdir / "schema.json").write_text('{"properties": {"a": {"description": "A"}}}')
+    (srcdir / "codelist.csv").write_text("Code,Description\nc,C\n")
+
+    expected = [
+        {
+            "docname": "a",
+            "lineno": 6,
+            "message": f"Pointer '/properties/nonexistent/description' not found: {srcdir / 'schema.json'}",
+        },
+        {
+            "docname": "a",
+            "lineno": 8,
+            "message": f"Value 'nonexistent' not found in column 'Code': {srcdir / 'codelist.csv'}",
+        },
+        {"docname": "b", "lineno": None, "message": "No worked examples are tagged with nonexistent"},
+        {"docname": "b", "lineno": 4, "message": "nonexistent==v1 is not in the extension registry"},
+    ]
+
+    # Failures are reported for documents that aren't re-read, too.
+    for _ in range(2):
+        app = make_app(
+            buildername="ocds-check", srcdir=srcdir, builddir=tmp_path / "build", confoverrides=registry.confoverrides
+        )
+        app.build()
+        app.cleanup()
+
+        with (tmp_path / "build" / "ocds-check" / "check.json").open(encoding="utf-8") as f:
+            assert json.load(f) == expected
+        assert app.statuscode == 1
+        assert not list((tmp_path / "build" / "ocds-check").glob("*.html"))
+
+    (srcdir / "index.rst").write_text(".. toctree::\n\n   a\n")
+    (srcdir / "b.rst").unlink()
+    (srcdir / "a.rst").write_text("A\n=\n\n.. field-description:: schema.json /properties/a\n")
+
+    app = make_app(
+        buildername="ocds-check", srcdir=srcdir, builddir=tmp_path / "build", confoverrides=registry.confoverrides
+    )
+    app.build()
+    app.cleanup()
+
+    with (tmp_path / "build" / "ocds-check" / "check.json").open(encoding="utf-8") as f:
+        assert json.load(f) == []
+    assert app.statuscode == 0
+
+
+def test_follow_refs(make_app, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text('extensions = ["sphinxcontrib.opencontracting"]\n')
+    (srcdir / "index.rst").write_text(
+        ".. field-description:: schema.json /properties/tender/properties/id\n\n"
+        ".. field-description-table:: schema.json /properties/tender/properties\n"
+    )
+    schema = {
+        "properties": {"tender": {"$ref": "#/definitions/Tender"}},
+        "definitions": {"Tender": {"properties": {"id": {"description": "An identifier"}}}},
+    }
+    (srcdir / "schema.json").write_text(json.dumps(schema))
+
+    for follow_refs, messages in ((True, 0), (False, 2)):
+        app = make_app(
+            buildername="html",
+            srcdir=srcdir,
+            builddir=tmp_path / "build",
+            confoverrides={"opencontracting_follow_refs": follow_refs},
+        )
+        app.build()
+        app.cleanup()
+
+        assert app.warning.getvalue().count("ERROR: Pointer") == messages
+
+
+def test_file_cache_invalidation(tmp_path):
+    file = tmp_path / "schema.json"
+    file.write_text("{}")
+    cache = FileCache(lambda path: path.read_text())
+
+    assert cache.get(file) == "{}"
+    assert cache.get(file) == "{}"
+
+    file.write_text('{"description": "changed"}')
+
+    assert cache.get(file) == '{"description": "changed"}'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_schema_cache_prune(tmp_path):
+    file = tmp_path / "schema.json"
+    file.write_text(
+        json.dumps(
+            {
+                "type": "object",
+                "properties": {
+                    "tender": {"$ref": "#/definitions/Tender", "description": "The tender"},
+                    "description": {"type": "string", "description": "A description"},
+                    "parties": {"type": "array", "items": {"$ref": "#/definitions/Party"}},
+                    "status": {"type": "string", "enum": ["active", "complete"]},
+                    "value": {"anyOf": [{"type": "number"}, {"type": "string", "description": "A string"}]},
+                },
+                "definitions": {
+                    "Tender": {
+                        "type": "object",
+                        "required": ["id"],
+                        "properties": {"id": {"type": "string", "description": "An identifier"}},
+                    },
+                    "Party": {"properties": {"roles": {"type": "array", "items": {"type": "string"}}}},
+                },
+            }
+        )
+    )
+
+    full = SchemaCache(prune_size=file.stat().st_size + 1).get(file)
+    pruned = SchemaCache(prune_size=file.stat().st_size).get(file)
+
+    assert pruned.descriptions == full.descriptions
+    assert pruned.dereferenced_descriptions == full.dereferenced_descriptions
+    assert pruned.dereferenced_descriptions["/properties/tender/properties/id"] == "An identifier"
+    # A property named "description" isn't a description.
+    assert "/properties" not in pruned.descriptions
+    assert pruned.data == {
+        "properties": {
+            "tender": {"$ref": "#/definitions/Tender", "description": "The tender"},
+            "description": {"description": "A description"},
+            "parties": {"items": {"$ref": "#/definitions/Party"}},
+            "value": {"anyOf": [{}, {"description": "A string"}]},
+        },
+        "definitions": {"Tender": {"properties": {"id": {"description": "An identifier"}}}},
+    }
+
+
 @pytest.mark.sphinx(buildername="html", srcdir=path("code-description"), freshenv=True)
 def test_code_description(app, status, warning):
     basename = "code-description"
@@ -81,42 +331,714 @@ def test_code_description(app, status, warning):
     )
 
 
-@pytest.mark.sphinx(buildername="html", srcdir=path("extensionexplorerlinklist"), freshenv=True)
-def test_extensionexplorerlinklist(app, status, warning):
-    assert_build(app, status, warning, "extensionexplorerlinklist")
-
-
 @pytest.mark.sphinx(
-    buildername="html", srcdir=path("extensionexplorerlinklist"), freshenv=True, confoverrides={"language": "fr"}
+    buildername="html",
+    srcdir=path("code-description"),
+    freshenv=True,
+    confoverrides={"opencontracting_description_cache_size": 0},
 )
-def test_extensionexplorerlinklist_i18n(app, status, warning):
-    assert_build(app, status, warning, "extensionexplorerlinklist")
+def test_code_description_cache(app, status, warning):
+    codelist_cache.clear()
+
+    app.build()
+
+    # codelist.csv is indexed once by the prescan, for two directives.
+    assert codelist_cache.hits == 2
+    assert codelist_cache.misses == 1
+
 
+@pytest.mark.sphinx(buildername="html", srcdir=path("field-description-table"), freshenv=True)
+def test_field_description_table(app, status, warning):
+    basename = "field-description-table"
 
-@pytest.mark.sphinx(buildername="html", srcdir=path("extensionexplorerlinklist-non-existing"), freshenv=True)
-def test_extensionexplorerlinklist_non_existing(app, status, warning):
     assert_build(
         app,
         status,
         warning,
-        "extensionexplorerlinklist-non-existing",
+        basename,
         [
-            "ERROR: bids==x is not in the extension registry",
+            f"ERROR: JSON Schema file not found: {path(basename, 'nonexistent.json')}",
+            f"ERROR: Pointer '/properties/nonexistent/*/description' not found: {path(basename, 'schema.json')}",
         ],
     )
 
 
-@pytest.mark.sphinx(buildername="html", srcdir=path("extensionlist"), freshenv=True)
-def test_extensionlist(app, status, warning):
+@pytest.mark.sphinx(buildername="html", srcdir=path("codelist-table"), freshenv=True)
+def test_codelist_table(app, status, warning):
+    basename = "codelist-table"
+
     assert_build(
         app,
         status,
         warning,
+        basename,
+        [
+            f"ERROR: CSV codelist file not found: {path(basename, 'nonexistent.csv')}",
+            f"ERROR: Value 'nonexistent' not found in column 'Code': {path(basename, 'codelist.csv')}",
+        ],
+    )
+
+
+def test_to_docutils_many():
+    markdown_cache.clear()
+
+    documents = markdown_cache.get_many(["A **description**", "Another", "A **description**"])
+
+    assert (markdown_cache.hits, markdown_cache.misses) == (1, 2)
+    assert [document.astext() for document in documents] == ["A description", "Another", "A description"]
+    assert documents[0].children[0] is not documents[2].children[0]
+
+
+def test_to_docutils():
+    markdown_cache.clear()
+
+    first = to_docutils("A **description**")
+    second = to_docutils("A **description**")
+
+    assert (markdown_cache.hits, markdown_cache.misses) == (1, 1)
+    assert first.astext() == second.astext() == "A description"
+    assert first.children[0] is not second.children[0]
+
+
+@pytest.mark.parametrize("count", [1, 10])
+def test_markdown_cache_settings(monkeypatch, count):
+    from myst_parser.mdit_to_docutils import base
+
+    calls = []
+
+    def counted(function):
+        def wrapper(*args, **kwargs):
+            calls.append(function.__name__)
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(base, "make_document", counted(base.make_document))
+    monkeypatch.setattr(base, "get_default_settings", counted(base.get_default_settings))
+
+    cache = MarkdownCache()
+    for i in range(count):
+        assert cache.get(f"Description {i}").astext() == f"Description {i}"
+
+    # The docutils settings are built once, however many descriptions are rendered.
+    assert calls == ["make_document", "get_default_settings"]
+
+
+@pytest.mark.sphinx(
+    buildername="html",
+    srcdir=path("field-description"),
+    freshenv=True,
+    confoverrides={"opencontracting_markdown_cache_size": 0},
+)
+def test_markdown_cache_size(app, status, warning):
+    app.build()
+
+    assert markdown_cache.maxsize == 0
+    assert not markdown_cache.entries
+
+
+def test_description_cache(make_app, tmp_path):
+    confoverrides = {"opencontracting_cache_dir": str(tmp_path / "cache")}
+
+    # Builds in other languages or directories share the cache. Errors aren't cached.
+    for builddir, hits, misses, rendered in (("en", 0, 3, 1), ("es", 1, 2, 0)):
+        markdown_cache.clear()
+        app = make_app(
+            buildername="html",
+            srcdir=path("field-description"),
+            builddir=tmp_path / builddir,
+            confoverrides=confoverrides,
+        )
+        app.build()
+        app.cleanup()
+
+        assert (description_cache.hits, description_cache.misses) == (hits, misses)
+        assert markdown_cache.misses == rendered
+
+    assert "A <strong>description</strong>" in (tmp_path / "es" / "html" / "index.html").read_text()
+
+
+def test_description_cache_eviction(tmp_path):
+    database = tmp_path / "descriptions.sqlite3"
+    cache = DescriptionCache(database)
+    for i in range(3):
+        cache.set(["schema", str(i), "/description"], str(i), to_docutils(str(i)).children)
+    cache.get(["schema", "0", "/description"])
+
+    with closing(sqlite3.connect(database)) as connection:
+        cache.maxsize = connection.execute("SELECT MAX(size) FROM entries").fetchone()[0] * 2
+    cache.evict()
+
+    assert cache.get(["schema", "0", "/description"])[0] == "0"
+    assert cache.get(["schema", "1", "/description"]) is None
+    assert cache.get(["schema", "2", "/description"])[0] == "2"
+
+
+def test_description_cache_corrupt(tmp_path):
+    database = tmp_path / "descriptions.sqlite3"
+    cache = DescriptionCache(database)
+    cache.set(["schema", "0", "/description"], "0", to_docutils("0").children)
+
+    with closing(sqlite3.connect(database)) as connection, connection:
+        connection.execute("UPDATE entries SET value = substr(value, 1, 10)")
+
+    assert cache.get(["schema", "0", "/description"]) is None
+    assert cache.misses == 1
+
+    with closing(sqlite3.connect(database)) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+
+
+def test_description_cache_versions(tmp_path):
+    database = tmp_path / "descriptions.sqlite3"
+    cache = DescriptionCache(database)
+    cache.set(["schema", "0", "/description"], "0", to_docutils("0").children)
+
+    assert cache.get(["schema", "0", "/description"])[0] == "0"
+
+    # After an upgrade, entries aren't reused.
+    cache = DescriptionCache(database)
+    cache.versions = ["0.0.0", *cache.versions[1:]]
+
+    assert cache.get(["schema", "0", "/description"]) is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"name": "Name"},
+        {"name": {"en": "Name"}, "documentationUrl": "https://example.com", "compatibility": "1.1"},
+        {"name": {"en": "Name"}, "description": {"en": "Description"}, "compatibility": ["1.1", "1.2"]},
+    ],
+)
+def test_get_extension_metadata(monkeypatch, http_server, data):
+    monkeypatch.setattr(http_cache, "directory", None)
+    http_server.routes["/extension/extension.json"] = (json.dumps(data).encode(), {})
+    extension = ExtensionVersion(
+        {
+            "Id": "extension",
+            "Date": "",
+            "Version": "v1",
+            "Base URL": http_server.url("/extension/"),
+            "Download URL": "",
+        }
+    )
+
+    # The metadata is normalized like upstream.
+    assert get_extension_metadata(extension) == extension.metadata
+
+
+def test_extensionexplorerlinklist(make_app, registry, tmp_path):
+    app = make_app(
+        buildername="html",
+        srcdir=path("extensionexplorerlinklist"),
+        builddir=tmp_path,
+        freshenv=True,
+        confoverrides=registry.confoverrides,
+    )
+    assert_build(app, app.status, app.warning, "extensionexplorerlinklist")
+
+
+def test_extensionexplorerlinklist_i18n(make_app, registry, tmp_path):
+    app = make_app(
+        buildername="html",
+        srcdir=path("extensionexplorerlinklist"),
+        builddir=tmp_path,
+        freshenv=True,
+        confoverrides={"language": "fr", **registry.confoverrides},
+    )
+    assert_build(app, app.status, app.warning, "extensionexplorerlinklist")
+
+
+def test_extensionexplorerlinklist_non_existing(make_app, registry, tmp_path):
+    app = make_app(
+        buildername="html",
+        srcdir=path("extensionexplorerlinklist-non-existing"),
+        builddir=tmp_path,
+        freshenv=True,
+        confoverrides=registry.confoverrides,
+    )
+    assert_build(
+        app,
+        app.status,
+        app.warning,
+        "extensionexplorerlinklist-non-existing",
+        [
+            "ERROR: bids==x is not in the extension registry",
+        ],
+    )
+
+
+def test_extensionlist(make_app, registry, tmp_path):
+    app = make_app(
+        buildername="html",
+        srcdir=path("extensionlist"),
+        builddir=tmp_path,
+        freshenv=True,
+        confoverrides=registry.confoverrides,
+    )
+    assert_build(
+        app,
+        app.status,
+        app.warning,
+        "extensionlist",
+        [
+            "WARNING: No extensions have category nonexistent in extensionlist directive",
+        ],
+    )
+
+
+def test_extensionlist_no_extension_versions(make_app, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text('extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {}\n')
+    (srcdir / "index.rst").write_text(
+        ".. extensionlist:: Tender\n   :list: tender\n\n.. extensionlist:: Nonexistent\n   :list: nonexistent\n"
+    )
+
+    app = make_app(
+        buildername="html", srcdir=srcdir, builddir=tmp_path / "build", confoverrides=registry.confoverrides
+    )
+    app.build()
+
+    # The category is checked against the extension registry, even if no extensions are configured.
+    warnings = app.warning.getvalue().strip().splitlines()
+    assert len(warnings) == 1
+    assert "No extensions have category nonexistent in extensionlist directive" in warnings[0]
+
+
+def test_extensionlist_rate_limit(make_app, registry, tmp_path):
+    # Only the extension registry's files and the Extension Explorer's extensions.json are served.
+    registry.rate_limit = 3
+
+    app = make_app(
+        buildername="html",
+        srcdir=path("extensionlist"),
+        builddir=tmp_path,
+        freshenv=True,
+        confoverrides=registry.confoverrides,
+    )
+    app.build()
+    app.cleanup()
+
+    with (tmp_path / "html" / "index.html").open(encoding="utf-8") as f:
+        element = lxml.html.fromstring(f.read())
+
+    # The extension is listed with its identifier, outside a live branch.
+    assert element.xpath('//div[@id="extensionlist-tender"]//dt/a/text()') == ["lots"]
+    assert element.xpath('//div[@id="extensionlist-tender"]//dd/p/text()') == ["lots"]
+    warnings = app.warning.getvalue().strip().split("\n")
+    assert len(warnings) == 1
+    assert "WARNING: No extensions have category nonexistent in extensionlist directive" in warnings[0]
+
+
+def test_extension_registry_cache_error():
+    cache = ExtensionRegistryCache()
+    cache.load({"bids": "v1.1.5"}, 1, registry_url="http://127.0.0.1:9/")
+
+    with pytest.raises(requests.ConnectionError):
+        cache.get_category("bids", "v1.1.5")
+    with pytest.raises(requests.ConnectionError):
+        cache.get_metadata("bids", "v1.1.5")
+
+
+def test_extension_registry_cache_dropped_connection(registry):
+    registry.routes["/extensions.csv"] = DROP
+
+    cache = ExtensionRegistryCache()
+    cache.load({"bids": "v1.1.5"}, 1, registry_url=registry.url("/"))
+
+    with pytest.raises(requests.ConnectionError):
+        cache.get_category("bids", "v1.1.5")
+
+
+def test_extension_registry_cache_latency(registry):
+    registry.latency = 0.3
+
+    start = time.perf_counter()
+    cache = ExtensionRegistryCache()
+    cache.load(
+        {"bids": "v1.1.5", "lots": "v1.1.5"},
+        8,
+        registry_url=registry.url("/"),
+        explorer_url=registry.url("/extensions.json"),
+    )
+    seconds = time.perf_counter() - start
+
+    assert cache.get_metadata("lots", "v1.1.5")["name"]["en"] == "Lots"
+    assert len(registry.requests) == 5
+    # The extensions' metadata and the Extension Explorer's names are requested concurrently.
+    assert seconds < 4 * registry.latency
+
+
+def test_get_extension_explorer_names(registry):
+    names = get_extension_explorer_names({"lots": "v1.1.5", "bids": "x"}, registry.url("/extensions.json"))
+
+    assert names == {("lots", "v1.1.5"): {"en": "Lots", "es": "Lotes"}}
+
+
+def test_extension_lockfile(make_app, registry, tmp_path):
+    lockfile = tmp_path / "extensions.lock.json"
+    confoverrides = {"opencontracting_extension_lockfile": str(lockfile), **registry.confoverrides}
+
+    app = make_app(
+        buildername="ocds-lock", srcdir=path("extensionlist"), builddir=tmp_path, confoverrides=confoverrides
+    )
+    app.build()
+    app.cleanup()
+
+    with lockfile.open(encoding="utf-8") as f:
+        data = json.load(f)
+
+    assert data["extension_versions"] == {"bids": "v1.1.5", "lots": "v1.1.5"}
+    assert data["categories"] == ["bids", "tender"]
+    assert data["extensions"]["lots"]["category"] == "tender"
+    assert data["extensions"]["lots"]["name"] == {"en": "Lots", "es": "Lotes"}
+    assert data["extensions"]["lots"]["explorer_name"] == {"en": "Lots", "es": "Lotes"}
+    assert data["extensions"]["lots"]["explorer_url"]["es"] == (
+        "https://extensions.open-contracting.org/es/extensions/lots/v1.1.5/"
+    )
+    assert data["extensions"]["lots"]["release_schema_url"] == registry.url("/lots/v1.1.5/release-schema.json")
+    assert data["extensions"]["lots"]["release_schema"]["definitions"]["Lot"]["description"] == "A lot."
+    assert data["extensions"]["bids"]["release_schema"] is None
+
+    # A build with a lockfile makes no requests.
+    count = len(registry.requests)
+    registry.routes.clear()
+
+    app = make_app(buildername="html", srcdir=path("extensionlist"), builddir=tmp_path, confoverrides=confoverrides)
+    assert_build(
+        app,
+        app.status,
+        app.warning,
         "extensionlist",
         [
             "WARNING: No extensions have category nonexistent in extensionlist directive",
         ],
     )
+    app.cleanup()
+
+    assert len(registry.requests) == count
+
+    app = make_app(
+        buildername="html", srcdir=path("extensionexplorerlinklist"), builddir=tmp_path, confoverrides=confoverrides
+    )
+    assert_build(app, app.status, app.warning, "extensionexplorerlinklist")
+
+
+def test_field_description_profile(build_html, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {"bids": "v1.1.5", "lots": "v1.1.5"}\n'
+    )
+    (srcdir / "index.rst").write_text(
+        ".. field-description:: schema.json /definitions/Tender/properties/lots\n   :profile:\n\n"
+        ".. field-description:: schema.json /definitions/Tender/properties/id\n   :profile:\n\n"
+        ".. field-description:: schema.json /definitions/Tender/properties/id\n"
+    )
+    schema = {
+        "definitions": {
+            "Tender": {
+                "properties": {
+                    "id": {"description": "The identifier of the tender."},
+                    "status": {"description": "The status of the tender."},
+                }
+            }
+        }
+    }
+    (srcdir / "schema.json").write_text(json.dumps(schema))
+    profiles = tmp_path / "build" / "doctrees" / "opencontracting" / "profiles"
+
+    html = tmp_path / "build" / "html" / "index.html"
+
+    _, read = build_html(srcdir, confoverrides=registry.confoverrides)
+    paragraphs = lxml.html.parse(html).xpath("//blockquote//p")
+
+    assert read == ["index"]
+    assert [lxml.html.tostring(p, encoding="unicode").strip() for p in paragraphs] == [
+        "<p>The <strong>lots</strong> into which the tender is divided.</p>",
+        "<p>The identifier of the tender, which is divided into lots.</p>",
+        "<p>The identifier of the tender.</p>",
+    ]
+    # The schema is merged once. bids has no release schema patch. null removes nothing.
+    assert (profile_cache.hits, profile_cache.misses) == (1, 1)
+    assert len(list(profiles.iterdir())) == 1
+    merged = json.loads(next(profiles.iterdir()).read_text())
+    assert merged["definitions"]["Tender"]["properties"]["status"] == {"description": "The status of the tender."}
+    assert merged["definitions"]["Lot"]["description"] == "A lot."
+
+    # The merged schema is cached across builds.
+    (srcdir / "index.rst").write_text((srcdir / "index.rst").read_text() + "\nChanged.\n")
+    count = sum(1 for request_path, _ in registry.requests if request_path.endswith("/release-schema.json"))
+
+    _, read = build_html(srcdir, confoverrides=registry.confoverrides)
+
+    assert read == ["index"]
+    assert (profile_cache.hits, profile_cache.misses) == (2, 0)
+    assert sum(1 for request_path, _ in registry.requests if request_path.endswith("/release-schema.json")) == count
+
+    # The schema is merged again if the JSON Schema file changes.
+    schema["definitions"]["Tender"]["properties"]["id"]["description"] = "The identifier."
+    (srcdir / "schema.json").write_text(json.dumps(schema))
+
+    _, read = build_html(srcdir, confoverrides=registry.confoverrides)
+    paragraphs = lxml.html.parse(html).xpath("//blockquote//p")
+
+    assert read == ["index"]
+    assert paragraphs[2].text == "The identifier."
+    assert len(list(profiles.iterdir())) == 2
+
+
+def test_profile_cache_eviction(tmp_path):
+    cache = ProfileCache(tmp_path)
+    for i in range(3):
+        (tmp_path / f"{i}.json").write_text("{}")
+        os.utime(tmp_path / f"{i}.json", (i, i))
+    cache.maxsize = 4
+    cache.evict()
+
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["1.json", "2.json"]
+
+
+def test_field_description_profile_lockfile(make_app, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {"bids": "v1.1.5", "lots": "v1.1.5"}\n'
+    )
+    (srcdir / "index.rst").write_text(".. field-description:: schema.json /definitions/Lot\n   :profile:\n")
+    (srcdir / "schema.json").write_text('{"definitions": {}}')
+    confoverrides = {
+        "opencontracting_extension_lockfile": str(tmp_path / "extensions.lock.json"),
+        **registry.confoverrides,
+    }
+
+    app = make_app(buildername="ocds-lock", srcdir=srcdir, builddir=tmp_path / "lock", confoverrides=confoverrides)
+    app.build()
+    app.cleanup()
+
+    # A build with a lockfile merges the patches in the lockfile, without requests.
+    count = len(registry.requests)
+    registry.routes.clear()
+
+    app = make_app(buildername="html", srcdir=srcdir, builddir=tmp_path / "build", confoverrides=confoverrides)
+    app.build()
+
+    assert app.warning.getvalue() == ""
+    assert "A lot." in (Path(app.outdir) / "index.html").read_text(encoding="utf-8")
+    assert len(registry.requests) == count
+
+
+def test_field_description_profile_lockfile_outdated(make_app, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {"lots": "v1.1.5"}\n'
+    )
+    (srcdir / "index.rst").write_text(".. field-description:: schema.json /properties/a\n   :profile:\n")
+    (srcdir / "schema.json").write_text('{"properties": {"a": {"description": "A"}}}')
+    # A lockfile written before ocds-lock wrote the patches.
+    lockfile = tmp_path / "extensions.lock.json"
+    lockfile.write_text(
+        json.dumps(
+            {
+                "extension_versions": {"lots": "v1.1.5"},
+                "categories": ["tender"],
+                "extensions": {
+                    "lots": {
+                        "version": "v1.1.5",
+                        "category": "tender",
+                        "name": {"en": "Lots"},
+                        "description": {"en": "Lots."},
+                        "explorer_name": {"en": "Lots"},
+                        "explorer_url": {"en": "https://extensions.open-contracting.org/en/extensions/lots/v1.1.5/"},
+                    }
+                },
+            }
+        )
+    )
+
+    app = make_app(
+        buildername="html",
+        srcdir=srcdir,
+        builddir=tmp_path / "build",
+        confoverrides={"opencontracting_extension_lockfile": str(lockfile)},
+    )
+    app.build()
+
+    assert "ERROR: lots==v1.1.5 couldn't be merged" in app.warning.getvalue()
+
+
+def test_field_description_profile_error(make_app, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {"nonexistent": "v1"}\n'
+    )
+    (srcdir / "index.rst").write_text(".. field-description:: schema.json /properties/a\n   :profile:\n")
+    (srcdir / "schema.json").write_text('{"properties": {"a": {"description": "A"}}}')
+
+    app = make_app(
+        buildername="html", srcdir=srcdir, builddir=tmp_path / "build", confoverrides=registry.confoverrides
+    )
+    app.build()
+
+    assert "ERROR: nonexistent==v1 couldn't be merged" in app.warning.getvalue()
+
+
+def test_extension_lockfile_drift(make_app, tmp_path):
+    lockfile = tmp_path / "extensions.lock.json"
+    lockfile.write_text('{"extension_versions": {"bids": "v1.1.4"}, "categories": [], "extensions": {}}')
+    confoverrides = {"opencontracting_extension_lockfile": str(lockfile)}
+
+    with pytest.raises(Error) as excinfo:
+        make_app(buildername="html", srcdir=path("extensionlist"), builddir=tmp_path, confoverrides=confoverrides)
+
+    assert str(excinfo.value) == f"extension_versions in conf.py doesn't match the extension lockfile: {lockfile}"
+
+
+def test_description_dependencies(build_html, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text('extensions = ["sphinxcontrib.opencontracting"]\n')
+    (srcdir / "index.rst").write_text(".. toctree::\n\n   a\n   b\n   c\n   d\n   e\n")
+    (srcdir / "a.rst").write_text("A\n=\n\n.. field-description:: schema.json /properties/a\n")
+    (srcdir / "b.rst").write_text("B\n=\n\n.. field-description:: schema.json /properties/b\n")
+    (srcdir / "c.rst").write_text("C\n=\n\n.. code-description:: codelist.csv c\n")
+    (srcdir / "d.rst").write_text("D\n=\n\n.. codelist-table:: codelist.csv\n   :codes: c\n")
+    (srcdir / "e.rst").write_text("E\n=\n\n.. field-description-table:: schema.json /properties\n")
+
+    def write(a, b, c):
+        schema = {"properties": {"a": {"description": a}, "b": {"description": b}}}
+        (srcdir / "schema.json").write_text(json.dumps(schema))
+        (srcdir / "codelist.csv").write_text(f"Code,Description\nc,{c}\nd,D\n")
+
+    def build():
+        return build_html(srcdir)[1]
+
+    write("A", "B", "C")
+    assert build() == ["a", "b", "c", "d", "e", "index"]
+
+    write("A", "B changed", "C")
+    assert build() == ["b", "e"]
+
+    write("A", "B changed", "C changed")
+    assert build() == ["c", "d"]
+
+    # Changing an unused description or code rebuilds nothing.
+    (srcdir / "codelist.csv").write_text("Code,Description\nc,C changed\nd,D changed\n")
+    assert build() == []
+
+
+def test_config_dependencies(build_html, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "index.rst").write_text(".. toctree::\n\n   a\n   b\n   c\n   d\n")
+    (srcdir / "a.rst").write_text("A\n=\n\n.. extensionlist:: A\n")
+    (srcdir / "b.rst").write_text("B\n=\n\n.. extensionexplorerlinklist::\n")
+    (srcdir / "c.rst").write_text("C\n=\n\n.. code-description:: codelist.csv c\n")
+    (srcdir / "d.rst").write_text("D\n=\n\nD\n")
+    (srcdir / "codelist.csv").write_text("Code,Description,Código,Descripción\nc,C,c,C\n")
+
+    def write(extension_versions, codelist_headers):
+        (srcdir / "conf.py").write_text(
+            'extensions = ["sphinxcontrib.opencontracting"]\n'
+            f"extension_versions = {extension_versions!r}\n"
+            f"codelist_headers = {codelist_headers!r}\n"
+        )
+
+    def build():
+        return build_html(srcdir, confoverrides=registry.confoverrides)[1]
+
+    en = {"code": "Code", "description": "Description"}
+    es = {"code": "Código", "description": "Descripción"}
+
+    write({"bids": "v1.1.5"}, {"en": en})
+    assert build() == ["a", "b", "c", "d", "index"]
+
+    write({"bids": "v1.1.5", "lots": "v1.1.5"}, {"en": en})
+    assert build() == ["a", "b"]
+
+    write({"bids": "v1.1.5", "lots": "v1.1.5"}, {"en": es})
+    assert build() == ["c"]
+
+    # Changing the headers of another language rebuilds nothing.
+    write({"bids": "v1.1.5", "lots": "v1.1.5"}, {"en": es, "es": en})
+    assert build() == []
+
+
+def test_prescan(build_html, registry, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(
+        'extensions = ["sphinxcontrib.opencontracting"]\nextension_versions = {"lots": "v1.1.5"}\n'
+    )
+    (srcdir / "index.rst").write_text(".. toctree::\n\n   a\n   b\n")
+    (srcdir / "a.rst").write_text(
+        "A\n=\n\n"
+        ".. note::\n\n"
+        "   .. field-description:: schema.json /properties/a\n\n"
+        ".. code-description:: codelist.csv c\n\n"
+        ".. field-description-table:: schema.json /properties\n"
+    )
+    (srcdir / "b.rst").write_text("B\n=\n\n.. extensionlist:: Extensions\n")
+    (srcdir / "schema.json").write_text('{"properties": {"a": {"description": "A"}}}')
+    (srcdir / "codelist.csv").write_text("Code,Description\nc,C\n")
+
+    def build(**confoverrides):
+        app, _ = build_html(srcdir, confoverrides=registry.confoverrides | confoverrides, verbosity=1)
+        return app.status.getvalue()
+
+    schema_cache.clear()
+    codelist_cache.clear()
+
+    status = build(opencontracting_description_cache_size=0)
+
+    assert "Prescanned 3 document(s)" in status
+    assert "Loaded 2 file(s) and the extension registry" in status
+    # The directives look up the files loaded by the prescan.
+    assert (schema_cache.hits, schema_cache.misses) == (2, 1)
+    assert (codelist_cache.hits, codelist_cache.misses) == (1, 1)
+
+    # The extension registry isn't read if no document that uses it is read.
+    count = len(registry.requests)
+    (srcdir / "a.rst").write_text("A\n=\n\n.. field-description:: schema.json /properties/a\n")
+
+    status = build()
+
+    assert "Prescanned 1 document(s)" in status
+    assert "Loaded 1 file(s) in" in status
+    assert len(registry.requests) == count
+
+    # The prescan can be disabled.
+    (srcdir / "b.rst").write_text("B\n=\n\n.. extensionlist:: Extension list\n")
+
+    status = build(opencontracting_prescan=False)
+
+    assert "Prescanned" not in status
+    # The directive loads the extension registry.
+    assert "Lots" in (tmp_path / "build" / "html" / "b.html").read_text(encoding="utf-8")
+
+
+def test_prescan_pattern():
+    text = (
+        ".. field-description:: schema.json /a\n"
+        "   .. code-description:: codelist.csv c\n"
+        "```{field-description-table} schema.json /properties\n```\n"
+        ":::{codelist-table} codelist.csv\n:::\n"
+        ".. extensionexplorerlinklist::\n"
+        ".. workedexample:: Example\n"
+        "Text .. field-description:: schema.json /b\n"
+    )
+
+    assert [match.group(1, 2, 3) for match in prescan_pattern.finditer(text)] == [
+        ("field-description", None, " schema.json /a"),
+        ("code-description", None, " codelist.csv c"),
+        (None, "field-description-table", " schema.json /properties"),
+        (None, "codelist-table", " codelist.csv"),
+        ("extensionexplorerlinklist", None, ""),
+    ]
 
 
 @pytest.mark.skipif(os.name == "nt", reason="Windows")
@@ -177,7 +1099,7 @@ def test_workedexample(app, status, warning):
     env = app.builder.env
     assert not hasattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE)
     assert_build(app, status, warning, "workedexample")
-    assert getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE)[0]["title"] == "Unsuccessful tender"
+    assert getattr(env, WORKEDEXAMPLE_ENV_ATTRIBUTE).by_docname["index"][0].title == "Unsuccessful tender"
 
 
 @pytest.mark.sphinx(buildername="html", srcdir=path("workedexamplelist"), freshenv=True)
@@ -185,6 +1107,121 @@ def test_workedexamplelist(app, status, warning):
     assert_build(app, status, warning, "workedexamplelist")
 
 
+def test_parallel(make_app, tmp_path):
+    srcdir = tmp_path / "src"
+    shutil.copytree(path("parallel"), srcdir)
+
+    outputs = {}
+    for parallel in (0, 4):
+        builddir = tmp_path / str(parallel)
+        app = make_app(buildername="html", srcdir=srcdir, builddir=builddir, freshenv=True, parallel=parallel)
+        app.build()
+        app.cleanup()
+
+        assert app.warning.getvalue() == ""
+        assert len(getattr(app.env, WORKEDEXAMPLE_ENV_ATTRIBUTE)) == 14
+
+        outputs[parallel] = {}
+        for file in sorted((builddir / "html").glob("*.html")):
+            element = lxml.html.fromstring(file.read_text(encoding="utf-8")).xpath('//div[@class="body"]')
+            if element:
+                outputs[parallel][file.name] = lxml.html.tostring(element[0]).decode()
+
+    assert len(outputs[0]) == 10
+    assert outputs[4] == outputs[0]
+
+    # An incremental parallel build doesn't duplicate the worked examples of documents that weren't re-read.
+    (srcdir / "page1.rst").touch()
+    (srcdir / "page2.rst").touch()
+    app = make_app(buildername="html", srcdir=srcdir, builddir=tmp_path / "4", parallel=4)
+    app.build()
+
+    assert len(getattr(app.env, WORKEDEXAMPLE_ENV_ATTRIBUTE)) == 14
+
+
+def test_profile(make_app, tmp_path):
+    srcdir = tmp_path / "src"
+    shutil.copytree(path("parallel"), srcdir)
+
+    reports = {}
+    for parallel in (0, 4):
+        builddir = tmp_path / str(parallel)
+        app = make_app(
+            buildername="html",
+            srcdir=srcdir,
+            builddir=builddir,
+            freshenv=True,
+            parallel=parallel,
+            confoverrides={"opencontracting_profile": True, "opencontracting_description_cache_size": 0},
+        )
+        app.build()
+        app.cleanup()
+
+        with (builddir / "html" / "opencontracting-profile.json").open(encoding="utf-8") as f:
+            reports[parallel] = json.load(f)
+
+        assert "FieldDescription: 7 calls" in app.status.getvalue()
+
+    for report in reports.values():
+        assert {name: timer["count"] for name, timer in report["timers"].items()} == {
+            "CodeDescription": 7,
+            "FieldDescription": 7,
+            "MarkdownCache.get_many": 14,
+            "WorkedExample": 14,
+            "WorkedExampleList": 2,
+            "prescan": 1,
+            "process_worked_example_nodes": 8,
+            "to_docutils": 14,
+            "warm-up": 1,
+        }
+        assert all(timer["p95"] <= timer["total"] for timer in report["timers"].values())
+
+        # The counters of parallel processes are merged.
+        assert report["caches"]["markdown"]["hits"] + report["caches"]["markdown"]["misses"] == 14
+
+
+def test_worked_examples_index():
+    worked_examples = WorkedExamples()
+    for docname, lineno, tags in (("b", 1, ("x",)), ("a", 2, ("x", "y")), ("a", 1, ("y",))):
+        worked_examples.add(WorkedExampleRecord(docname, lineno, f"worked-example-{lineno}", "Title", tags))
+
+    assert [(e.docname, e.lineno) for e in worked_examples.tagged("x")] == [("a", 2), ("b", 1)]
+    assert [(e.docname, e.lineno) for e in worked_examples.tagged("y")] == [("a", 2), ("a", 1)]
+
+    worked_examples.purge("a")
+
+    assert len(worked_examples) == 1
+    assert worked_examples.by_tag == {"x": {"b": [("b", 1, "worked-example-1", "Title", ("x",))]}}
+
+
+def test_workedexamplelist_duplicate_tags(make_app, tmp_path):
+    srcdir = tmp_path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text('extensions = ["sphinxcontrib.opencontracting"]\n')
+    (srcdir / "index.rst").write_text(
+        "Title\n=====\n\n"
+        ".. workedexample:: A worked example\n   :tags: award,award\n\n"
+        ".. workedexamplelist:: Award examples\n   :tag: award\n"
+    )
+
+    app = make_app(buildername="html", srcdir=srcdir, builddir=tmp_path / "build", freshenv=True)
+    app.build()
+
+    assert app.warning.getvalue() == ""
+    assert getattr(app.env, WORKEDEXAMPLE_ENV_ATTRIBUTE).by_docname["index"][0].tags == ("award",)
+    html = (Path(app.outdir) / "index.html").read_text(encoding="utf-8")
+    assert html.count("A worked example") == 1
+
+
+@pytest.mark.sphinx(buildername="singlehtml", srcdir=path("parallel"), freshenv=True)
+def test_workedexamplelist_singlehtml(app, status, warning):
+    app.build()
+
+    assert warning.getvalue() == ""
+    html = (Path(app.outdir) / "index.html").read_text(encoding="utf-8")
+    assert html.count("Another worked example") == 14  # 7 headings and 7 links in the award list
+
+
 @pytest.mark.sphinx(buildername="html", srcdir=path("workedexamplelist-non-existing"), freshenv=True)
 def test_workedexamplelist_nonexistent(app, status, warning):
     with pytest.raises(Error) as excinfo:
@@ -0,0 +1,183 @@
+import email.utils
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from sphinxcontrib.opencontracting import HTTPCache
+from tests.conftest import DROP
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HTTPCache(tmp_path, ttl=3600)
+
+
+def test_http_cache_hit(http_server, cache):
+    http_server.routes["/file"] = (b"content", {})
+
+    assert cache.get(http_server.url("/file")) == b"content"
+    assert cache.get(http_server.url("/file")) == b"content"
+
+    assert len(http_server.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_http_cache_persistent(http_server, tmp_path):
+    http_server.routes["/file"] = (b"content", {})
+
+    assert HTTPCache(tmp_path).get(http_server.url("/file")) == b"content"
+    assert HTTPCache(tmp_path).get(http_server.url("/file")) == b"content"
+
+    assert len(http_server.requests) == 1
+
+
+@pytest.mark.parametrize(
+    ("headers", "request_header"),
+    [
+        ({"ETag": '"abc"'}, "If-None-Match"),
+        ({"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, "If-Modified-Since"),
+    ],
+)
+def test_http_cache_revalidated(http_server, cache, headers, request_header):
+    http_server.routes["/file"] = (b"content", headers)
+    cache.ttl = 0
+
+    assert cache.get(http_server.url("/file")) == b"content"
+    http_server.routes["/file"] = (b"changed", headers)
+    body = cache.get(http_server.url("/file"))
+
+    assert body == b"content"
+    assert http_server.requests[1][1][request_header] == next(iter(headers.values()))
+    assert (cache.revalidated, cache.misses) == (1, 1)
+
+
+def test_http_cache_stale(http_server, cache):
+    http_server.routes["/file"] = (b"content", {})
+    cache.ttl = 0
+
+    assert cache.get(http_server.url("/file")) == b"content"
+    http_server.routes["/file"] = 503
+
+    assert cache.get(http_server.url("/file")) == b"content"
+    assert (cache.stale, cache.misses) == (1, 1)
+
+
+def test_http_cache_error(http_server, cache):
+    http_server.routes["/file"] = 503
+
+    with pytest.raises(requests.HTTPError):
+        cache.get(http_server.url("/file"))
+
+
+def test_http_cache_disabled(http_server):
+    http_server.routes["/file"] = (b"content", {})
+    cache = HTTPCache()
+
+    assert cache.get(http_server.url("/file")) == b"content"
+    assert cache.get(http_server.url("/file")) == b"content"
+
+    assert len(http_server.requests) == 2
+
+
+def test_transport_keep_alive(http_server, transport):
+    http_server.routes["/file"] = (b"content", {})
+
+    assert transport.get(http_server.url("/file")).content == b"content"
+    assert transport.get(http_server.url("/file")).content == b"content"
+
+    assert len(http_server.connections) == 1
+    assert transport.hosts[f"127.0.0.1:{http_server.server_port}"]["requests"] == 2
+
+
+def test_transport_retry(http_server, transport):
+    http_server.routes["/file"] = [503, DROP, (b"content", {})]
+
+    assert HTTPCache().get(http_server.url("/file")) == b"content"
+
+    assert len(http_server.requests) == 3
+    assert transport.hosts[f"127.0.0.1:{http_server.server_port}"] == {
+        "requests": 3,
+        "retries": 2,
+        "errors": 1,
+        "seconds": pytest.approx(0, abs=1),
+    }
+
+
+def test_transport_retries_exhausted(http_server, transport):
+    http_server.routes["/file"] = 503
+
+    with pytest.raises(requests.HTTPError):
+        HTTPCache().get(http_server.url("/file"))
+
+    assert len(http_server.requests) == 4
+
+
+@pytest.mark.parametrize(
+    ("route", "status", "count"),
+    [
+        (403, 403, 1),
+        ((403, {"X-RateLimit-Remaining": "0"}), 200, 2),
+        (429, 200, 2),
+    ],
+)
+def test_transport_rate_limit(http_server, transport, route, status, count):
+    http_server.routes["/file"] = [route, (b"content", {})]
+
+    response = transport.get(http_server.url("/file"))
+
+    assert response.status_code == status
+    assert len(http_server.requests) == count
+
+
+def test_transport_rate_limit_reason(http_server, transport):
+    http_server.rate_limit = 1
+    http_server.routes["/file"] = (b"content", {})
+
+    response = transport.get(http_server.url("/file"))
+    response = transport.get(http_server.url("/file"))
+
+    # GitHub's "403 rate limit exceeded" is retried.
+    assert response.status_code == 403
+    assert len(http_server.requests) == 5
+
+
+@pytest.mark.parametrize("retry_after", ["0.3", "date"])
+def test_transport_retry_after(http_server, transport, retry_after):
+    if retry_after == "date":
+        # HTTP dates have a precision of one second.
+        retry_after = email.utils.formatdate(time.time() + 2, usegmt=True)
+    http_server.routes["/file"] = [(503, {"Retry-After": retry_after}), (b"content", {})]
+
+    start = time.perf_counter()
+    response = transport.get(http_server.url("/file"))
+
+    assert response.content == b"content"
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_transport_backoff(http_server, transport):
+    http_server.routes["/file"] = 503
+    transport.configure(retries=2, backoff=0.1, max_connections=8)
+
+    start = time.perf_counter()
+    response = transport.get(http_server.url("/file"))
+
+    assert response.status_code == 503
+    # 0.1 + 0.2 seconds
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_transport_max_connections(http_server, transport):
+    http_server.routes["/file"] = (b"content", {})
+    http_server.latency = 0.2
+    transport.configure(retries=0, backoff=0, max_connections=2)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(transport.get, [http_server.url("/file")] * 4))
+
+    assert [response.content for response in responses] == [b"content"] * 4
+    # Two batches of two requests.
+    assert time.perf_counter() - start >= 0.4
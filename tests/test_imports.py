@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from tests import path
+
+# The dependencies that are imported only when first used.
+LAZY = ("markdown_it", "myst_parser", "ocdsextensionregistry", "requests")
+# Sphinx imports requests in every build, for its linkcheck builder.
+BUILD_LAZY = tuple(name for name in LAZY if name != "requests")
+
+# Build a project, and print the lazy dependencies that were imported.
+RUNNER = """
+import json, sys
+from sphinx.cmd.build import main
+status = main(["-b", "html", "-q", "-E", sys.argv[1], sys.argv[2]])
+print(json.dumps({"status": status, "modules": sorted(name for name in %r if name in sys.modules)}))
+"""
+
+
+def imported(stderr):
+    # https://docs.python.org/3/using/cmdline.html#cmdoption-X
+    return {line.rsplit("|", 1)[1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_import():
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import sphinx.application; import sphinxcontrib.opencontracting"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = imported(process.stderr)
+
+    assert "sphinxcontrib.opencontracting" in modules
+    assert not modules & set(LAZY)
+
+
+@pytest.mark.parametrize(
+    ("basename", "expected"),
+    [
+        ("workedexample", []),
+        ("workedexamplelist", []),
+        ("field-description", ["markdown_it", "myst_parser"]),
+        ("code-description", ["markdown_it", "myst_parser"]),
+    ],
+)
+def test_build_imports(tmp_path, basename, expected):
+    process = subprocess.run(
+        [sys.executable, "-c", RUNNER % (BUILD_LAZY,), str(path(basename)), str(tmp_path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+
+    assert result == {"status": 0, "modules": expected}
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+from sphinxcontrib.opencontracting import Watcher, extension_registry_cache, schema_cache
+from tests import path
+
+
+def write_project(srcdir):
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text('extensions = ["sphinxcontrib.opencontracting"]\n')
+    (srcdir / "index.rst").write_text(".. field-description:: schema.json /properties/field\n")
+    (srcdir / "schema.json").write_text(json.dumps({"properties": {"field": {"description": "A description"}}}))
+
+
+def test_watcher(tmp_path):
+    srcdir = tmp_path / "src"
+    outdir = tmp_path / "out"
+    write_project(srcdir)
+
+    watcher = Watcher([str(srcdir), str(outdir), "-q"])
+    watcher.poll()
+
+    assert watcher.build() == 0
+    assert schema_cache.misses == 1
+
+    (srcdir / "index.rst").write_text(".. field-description:: schema.json /properties/field\n\nA paragraph.\n")
+    changed = watcher.poll()
+
+    assert changed == {srcdir / "index.rst"}
+    assert watcher.build(changed) == 0
+    assert (schema_cache.hits, schema_cache.misses) == (1, 0)
+
+    (srcdir / "schema.json").write_text(json.dumps({"properties": {"field": {"description": "A new description"}}}))
+    changed = watcher.poll()
+
+    assert changed == {srcdir / "schema.json"}
+    assert watcher.build(changed) == 0
+    assert schema_cache.misses == 1
+    assert "A new description" in (outdir / "index.html").read_text()
+
+
+def test_watcher_ignore(tmp_path):
+    srcdir = tmp_path / "src"
+    write_project(srcdir)
+
+    watcher = Watcher([str(srcdir), str(srcdir / "_build"), "-q", "-D", "opencontracting_cache_dir=_cache"])
+    watcher.poll()
+    watcher.build()
+
+    # The build directory and the cache directory are written to, but not watched.
+    assert (srcdir / "_cache").is_dir()
+    assert watcher.poll() == set()
+
+
+def test_watcher_directories(tmp_path):
+    watcher = Watcher(["src", "out", "-d", "doctrees"], paths=["schema"], ignore=["src/_static"])
+
+    assert watcher.paths == [Path("src").resolve(), Path("schema").resolve()]
+    assert watcher.ignore == {Path(name).resolve() for name in ("out", "doctrees", "src/_static")}
+
+
+def test_watcher_extension_registry(monkeypatch, registry, tmp_path):
+    argv = [str(path("extensionlist")), str(tmp_path), "-q"]
+    for name, value in registry.confoverrides.items():
+        argv += ["-D", f"{name}={value}"]
+
+    watcher = Watcher(argv)
+
+    watcher.build()
+    loaded_at = extension_registry_cache.loaded_at
+    watcher.build()
+
+    # The extension registry is loaded again, unless persistent.
+    assert extension_registry_cache.loaded_at != loaded_at
+
+    monkeypatch.setattr(extension_registry_cache, "persistent", True)
+
+    watcher.build()
+    loaded_at = extension_registry_cache.loaded_at
+    watcher.build()
+
+    assert extension_registry_cache.loaded_at == loaded_at
+
+    # The extension registry is loaded again, if the configuration changes.
+    watcher.argv += ["-D", "extension_versions.bids=v1.1.4"]
+    watcher.build()
+
+    assert extension_registry_cache.loaded_at != loaded_at